@@ -1,22 +1,77 @@
 # ai_cleaner.py
 import os
+import re
+import asyncio
+import logging
+import functools
 import google.generativeai as genai
+from cache_utils import disk_cache, GEMINI_CACHE_DIR
+from loop_utils import run_async
 
 # Load Gemini API key from environment
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-def clean_text_with_ai(raw_text: str) -> str:
+CLEAN_MODEL_NAME = "gemini-2.5-flash"         # mechanical spelling/linebreak fixes don't need pro
+CLEAN_FALLBACK_MODEL_NAME = "gemini-2.5-pro"
+MIN_CLEAN_RATIO = 0.5         # flash output shorter than this fraction of its input is retried on pro
+MAX_CHUNK_CHARS = 8000        # ~2K tokens per cleaning request
+MAX_CONCURRENT_CLEANS = 8     # stay well inside per-project RPM
+# output budget: cleaned text is about as long as its input (~4 chars per token), plus headroom,
+# plus the 2.5 models' thinking tokens, which count against max_output_tokens too
+CHARS_PER_TOKEN = 4
+CLEAN_OUTPUT_HEADROOM = 1.5
+THINKING_TOKEN_BUDGET = 4096
+
+_PARA_SPLIT = re.compile(r'\n\s*\n+')
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=4)
+def _get_model(name=CLEAN_MODEL_NAME):
+    # built once per process instead of on every cleaning call
+    return genai.GenerativeModel(name)
+
+@disk_cache(GEMINI_CACHE_DIR)
+async def _generate_clean_text(model_name, prompt, max_output_tokens):
+    # cached by BLAKE2b(model|prompt|budget) so reruns on the same OCR text don't re-bill tokens
+    model = _get_model(model_name)
+    config = genai.GenerationConfig(temperature=0.0, max_output_tokens=max_output_tokens)
+    response = await model.generate_content_async(prompt, generation_config=config)
+    finish = response.candidates[0].finish_reason if response.candidates else None
+    finish = getattr(finish, "name", finish)
+    logger.debug("%s finished with %s (budget %d tokens)", model_name, finish, max_output_tokens)
+    if finish not in (None, "STOP"):
+        # truncated or blocked text is not a clean page; raising keeps it out of the disk cache
+        logger.warning("%s stopped with finish_reason=%s (budget %d tokens)", model_name, finish, max_output_tokens)
+        raise RuntimeError(f"{model_name} stopped early: {finish}")
+    return response.text.strip()
+
+def _output_budget(chunk):
+    return int(len(chunk) / CHARS_PER_TOKEN * CLEAN_OUTPUT_HEADROOM) + THINKING_TOKEN_BUDGET
+
+def _chunks(text, max_chars=MAX_CHUNK_CHARS):
     """
-    Uses Gemini AI to clean OCR extracted text:
-    - Fix spelling errors
-    - Remove unnecessary line breaks
-    - Keep original meaning intact
-    - Format into readable clean text
+    Split on paragraph boundaries and greedily pack paragraphs into blocks of <= max_chars.
+    A single paragraph longer than max_chars is hard-split.
     """
-    if not raw_text or raw_text.strip() == "":
-        return ""
+    chunks, current, size = [], [], 0
+    for para in _PARA_SPLIT.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if current and size + len(para) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        while len(para) > max_chars:
+            chunks.append(para[:max_chars])
+            para = para[max_chars:]
+        current.append(para)
+        size += len(para) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
 
-    prompt = f"""
+def _build_prompt(raw_text):
+    return f"""
     You are a text-cleaning assistant.
     The following text is extracted from an image/PDF using OCR.
     OCR makes spelling mistakes, breaks lines unnecessarily, and may miss punctuation.
@@ -30,12 +85,46 @@ def clean_text_with_ai(raw_text: str) -> str:
     {raw_text}
     """
 
-    try:
-        model = genai.GenerativeModel("gemini-2.5-pro")
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        return f"[AI Cleaning Failed] {str(e)}"
+async def clean_text_with_ai_async(raw_text: str) -> str:
+    """
+    Async cleaner: chunks the OCR text and cleans all chunks concurrently
+    (bounded by MAX_CONCURRENT_CLEANS), then stitches them back in order.
+    """
+    if not raw_text or raw_text.strip() == "":
+        return ""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_CLEANS)
+
+    async def clean_chunk(chunk):
+        async with sem:
+            prompt = _build_prompt(chunk)
+            max_tokens = _output_budget(chunk)
+            # flash first; pro when flash fails outright or returns suspiciously little text
+            cleaned = None
+            try:
+                cleaned = await _generate_clean_text(CLEAN_MODEL_NAME, prompt, max_tokens)
+                if len(cleaned) >= MIN_CLEAN_RATIO * len(chunk):
+                    return cleaned
+            except Exception as e:
+                logger.warning("%s cleaning failed, retrying on %s: %s", CLEAN_MODEL_NAME,
+                               CLEAN_FALLBACK_MODEL_NAME, e)
+            try:
+                return await _generate_clean_text(CLEAN_FALLBACK_MODEL_NAME, prompt, max_tokens)
+            except Exception as e:
+                return cleaned if cleaned is not None else f"[AI Cleaning Failed] {str(e)}"
+
+    outs = await asyncio.gather(*[clean_chunk(c) for c in _chunks(raw_text)])
+    return "\n\n".join(outs)
+
+def clean_text_with_ai(raw_text: str) -> str:
+    """
+    Uses Gemini AI to clean OCR extracted text:
+    - Fix spelling errors
+    - Remove unnecessary line breaks
+    - Keep original meaning intact
+    - Format into readable clean text
+    Large inputs are cleaned in parallel ~2K-token chunks, on the shared event loop.
+    """
+    return run_async(clean_text_with_ai_async(raw_text))
 
 
 # # ai_cleaner.py
@@ -4,18 +4,35 @@ load_dotenv()
 import os
 import io
 import json
-import re
+import csv
+import hashlib
 import random
+import asyncio
+import queue
+import shutil
+import threading
+import time
 import tempfile
 import pandas as pd
 import plotly.express as px
 from fpdf import FPDF
+from concurrent.futures import ThreadPoolExecutor
 
 # ✅ High-accuracy OCR functions
-from ocr_utils import ensure_tesseract, pdf_bytes_to_text, image_bytes_to_text
+from ocr_utils import ensure_tesseract, iter_pdf_pages, pdf_pages_cached, image_text_cached
 from syllabus_parser import parse_syllabus_text, validate_syllabus_json
-from gemini_handler import analyze_question
-from ai_cleaner import clean_text_with_ai   # NEW import
+from question_splitter import iter_questions_from_pages, split_questions_from_text as _split_questions
+from gemini_handler import (analyze_question_group_async, analyze_questions_batch,
+                            batch_available, syllabus_context_cache, GROUP_SIZE)
+from ai_cleaner import clean_text_with_ai, clean_text_with_ai_async   # NEW import
+from loop_utils import run_async, submit
+
+# pyarrow is optional — if installed, the CSV download is written by its vectorized C++ writer
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except Exception:
+    pa = pacsv = None
 
 # ---------------- App Config ----------------
 st.set_page_config(page_title="Jadavpur University Question Analyzer", layout="wide")
@@ -30,28 +47,256 @@ syllabus_file = st.sidebar.file_uploader("Upload Syllabus (pdf/png/jpg/jpeg/json
 question_file = st.sidebar.file_uploader("Upload Question Paper (pdf/png/jpg/jpeg/json)", type=["pdf","png","jpg","jpeg","json"])
 tess_override = st.sidebar.text_input("Optional: TESSERACT exe path (leave blank to auto-detect)", value="")
 max_questions = st.sidebar.number_input("Max questions to analyze (for testing)", min_value=1, max_value=1000, value=200)
+use_batch = st.sidebar.checkbox("Use Gemini Batch API (≈50% cheaper, results may take a while)", value=False)
+questions_per_call = st.sidebar.slider("Questions per Gemini call", 1, 25, GROUP_SIZE)
+use_pipeline = st.sidebar.checkbox("Stream PDF pages through OCR → split → analysis", value=True)
+auto_dpi = st.sidebar.checkbox("Auto-pick OCR DPI from first-page confidence", value=False)
+ocr_dpi = "auto" if auto_dpi else st.sidebar.slider("OCR DPI", 150, 400, 200)
 run_button = st.sidebar.button("Run Analysis")
 
 # configure tesseract
 tpath = ensure_tesseract(tess_override)
 st.sidebar.write(f"Using Tesseract: `{tpath}`")
 
+# ---------------- Helper: Spool Uploads to Disk ----------------
+def spool_upload(uploaded_file):
+    """Copy an upload into a temp file in 1 MiB chunks and return its path (caller unlinks)."""
+    suffix = os.path.splitext(uploaded_file.name)[1]
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(uploaded_file, tmp, length=1 << 20)
+    return tmp.name
+
 # ---------------- Helper: Split Questions ----------------
-def split_questions_from_text(text):
-    if not text or text.strip() == "":
-        return []
-    text = text.replace("\r", "\n")
-    parts = re.split(r'\n\s*(?=(?:\d{1,3}\.|Q\.\s*\d{1,3}|\d{1,3}\)))', text)
-    questions = []
-    for p in parts:
-        p = p.strip()
-        if not p:
-            continue
-        inner = re.split(r'(?<=\S)\n\s*(?=\d{1,3}\.)', p)
-        for it in inner:
-            if it.strip():
-                questions.append(it.strip())
-    return [q for q in questions if len(q) > 10][:max_questions]
+split_questions_from_text = st.cache_data(show_spinner=False)(_split_questions)
+
+# ---------------- Helper: Result Rows ----------------
+# every result row carries all of these, so frames never need a fillna pass
+RESULT_COLS = ["index", "question_text", "subject_name", "subject_code", "year", "semester",
+               "probable_topic", "course_outcome", "question_type", "confidence_score",
+               "difficulty", "blooms_level", "error_message", "ai_raw_output"]
+
+def error_result(q, e):
+    return {**dict.fromkeys(RESULT_COLS, ""), "question_text": q, "confidence_score": 0.0, "error_message": str(e)}
+
+def results_frame(rows):
+    return pd.DataFrame.from_records(rows, columns=RESULT_COLS)
+
+# ---------------- Helper: Difficulty & Bloom's Tagging ----------------
+def tag_question(analysis, q):
+    # Difficulty tagging
+    length = len(q.split())
+    if length < 8: analysis["difficulty"] = "Easy"
+    elif length < 15: analysis["difficulty"] = "Medium"
+    else: analysis["difficulty"] = "Hard"
+
+    # Bloom’s tagging
+    txt = q.lower()
+    if any(w in txt for w in ["define", "list", "state"]): analysis["blooms_level"] = "Remember"
+    elif any(w in txt for w in ["explain", "describe", "summarize"]): analysis["blooms_level"] = "Understand"
+    elif any(w in txt for w in ["apply", "solve", "use"]): analysis["blooms_level"] = "Apply"
+    elif any(w in txt for w in ["analyze", "differentiate", "compare"]): analysis["blooms_level"] = "Analyze"
+    elif any(w in txt for w in ["evaluate", "justify", "assess"]): analysis["blooms_level"] = "Evaluate"
+    elif any(w in txt for w in ["design", "create", "formulate"]): analysis["blooms_level"] = "Create"
+    else: analysis["blooms_level"] = "Uncategorized"
+    return analysis
+
+# ---------------- Helper: Load Inputs ----------------
+def file_digest(uploaded_file):
+    return hashlib.blake2b(uploaded_file.getvalue(), digest_size=16).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def _ocr_cached(digest, is_pdf, dpi, _uploaded_file):
+    # keyed by content digest + dpi — reruns on the same file skip OCR; the upload itself isn't hashed
+    # returns [(page_text, ocred)] — text-layer PDF pages come back with ocred=False
+    path = spool_upload(_uploaded_file)
+    try:
+        if is_pdf:
+            return pdf_pages_cached(path, dpi=dpi)
+        return [(image_text_cached(path), True)]
+    finally:
+        os.unlink(path)
+
+def _ocr_upload(uploaded_file):
+    return _ocr_cached(file_digest(uploaded_file), uploaded_file.name.endswith(".pdf"), ocr_dpi, uploaded_file)
+
+_parse_syllabus_cached = st.cache_data(show_spinner=False)(parse_syllabus_text)
+
+async def _clean_pages(texts):
+    return await asyncio.gather(*[clean_text_with_ai_async(t) for t in texts])
+
+def clean_ocr_pages(pages):
+    """
+    AI-clean only the OCR'd pages and join everything back in page order;
+    text-layer pages are already clean and are passed through untouched.
+    """
+    ocred = [t for t, is_ocr in pages if is_ocr]
+    cleaned = iter(run_async(_clean_pages(ocred)) if ocred else [])
+    return "\n\n".join(next(cleaned) if is_ocr else t for t, is_ocr in pages)
+
+def load_syllabus(uploaded_file):
+    """
+    Blocking: returns (syllabus_structured, cleaned_text). cleaned_text is None for JSON uploads.
+    """
+    if uploaded_file.name.endswith(".json"):
+        parsed = json.loads(uploaded_file.read().decode("utf-8"))
+        return validate_syllabus_json(parsed), None
+    # ✅ AI-based cleaning
+    cleaned_text = clean_ocr_pages(_ocr_upload(uploaded_file))
+    return _parse_syllabus_cached(cleaned_text), cleaned_text
+
+def load_question_text(uploaded_file):
+    """
+    Blocking: returns (question_text, from_ocr).
+    """
+    if uploaded_file.name.endswith(".json"):
+        return uploaded_file.read().decode("utf-8"), False
+    # ✅ AI-based cleaning
+    return clean_ocr_pages(_ocr_upload(uploaded_file)), True
+
+async def _load_inputs(syllabus_file, question_file):
+    # Tesseract (CPU) and Gemini cleaning (network) for both files overlap in worker threads;
+    # exceptions are returned rather than raised so each file reports its own error
+    if question_file is None:
+        syllabus_out = await asyncio.gather(asyncio.to_thread(load_syllabus, syllabus_file),
+                                            return_exceptions=True)
+        return syllabus_out[0], None
+    return await asyncio.gather(
+        asyncio.to_thread(load_syllabus, syllabus_file),
+        asyncio.to_thread(load_question_text, question_file),
+        return_exceptions=True,
+    )
+
+# ---------------- Helper: Concurrent Gemini Analysis ----------------
+MAX_CONCURRENT_REQUESTS = 32
+
+async def _analyze_group(sem, group, syllabus, cache_name=None):
+    # one grouped Gemini call under the shared semaphore; a failure marks every question in it
+    async with sem:
+        try:
+            return await analyze_question_group_async(group, syllabus, cache_name)
+        except Exception as e:
+            return [error_result(q, e) for q in group]
+
+async def _gather_all(questions, syllabus, counts, cache_name=None, group_size=1):
+    """
+    Fire all Gemini calls at once (capped by a semaphore), group_size questions per call,
+    and add to counts["analyzed"] as each one resolves. Runs on the shared loop, which never
+    touches st.*; see analyze_all for the progress bar. Returns results in input order.
+    """
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def sem_wrapped(i, group):
+        return i, await _analyze_group(sem, group, syllabus, cache_name)
+
+    results = [None] * len(questions)
+    tasks = [sem_wrapped(i, questions[i:i + group_size]) for i in range(0, len(questions), group_size)]
+    for fut in asyncio.as_completed(tasks):
+        i, analyses = await fut
+        for j, analysis in enumerate(analyses, start=i):
+            analysis["index"] = j + 1
+            results[j] = tag_question(analysis, questions[j])
+        counts["analyzed"] += len(analyses)
+    return results
+
+def analyze_all(questions, syllabus, progress, cache_name=None, group_size=1):
+    """Blocking: _gather_all on the shared loop while this (script) thread polls the progress bar."""
+    counts = {"analyzed": 0}
+    fut = submit(_gather_all(questions, syllabus, counts, cache_name, group_size))
+    while not fut.done():
+        progress.progress(counts["analyzed"] / len(questions))
+        time.sleep(0.25)
+    progress.progress(1.0)
+    return fut.result()
+
+# ---------------- Helper: OCR → Split → Analysis Pipeline ----------------
+_DONE = object()
+
+def run_question_pipeline(pdf_path, syllabus, limit, status, cache_name=None, group_size=1):
+    """
+    Three stages joined by queues, so Gemini analysis starts while later pages are still being OCR'd:
+      1. OCR + AI-clean one page at a time (text-layer pages skip both)
+      2. split page text into questions incrementally
+      3. the shared event loop sends the questions found so far, up to group_size per call,
+         through analyze_question_group_async (same semaphore and context cache as _gather_all)
+    Worker threads never touch st.*; the script thread polls the shared counters and updates `status`.
+    Returns (cleaned_pages, results) with results in question order.
+    """
+    page_q, question_q = queue.Queue(maxsize=4), queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    counts = {"pages": 0, "questions": 0, "analyzed": 0}
+    cleaned_pages, results = [], {}
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def ocr_stage():
+        try:
+            for text, ocred in iter_pdf_pages(pdf_path, dpi=ocr_dpi):
+                if stop.is_set():
+                    break
+                cleaned = clean_text_with_ai(text) if ocred else text
+                cleaned_pages.append(cleaned)
+                page_q.put(cleaned)
+                bump("pages")
+        finally:
+            page_q.put(_DONE)
+
+    def split_stage():
+        pages = iter(page_q.get, _DONE)
+        try:
+            for i, q in enumerate(iter_questions_from_pages(pages)):
+                if i >= limit:
+                    break
+                question_q.put((i, q))
+                bump("questions")
+        finally:
+            # stop OCR early and drain so it is never left blocked on a full queue
+            stop.set()
+            for _ in pages:
+                pass
+            question_q.put(_DONE)
+
+    async def analyze_group(sem, group):
+        analyses = await _analyze_group(sem, [q for _, q in group], syllabus, cache_name)
+        for (i, q), analysis in zip(group, analyses):
+            analysis["index"] = i + 1
+            results[i] = tag_question(analysis, q)
+            bump("analyzed")
+
+    async def analyze_stream():
+        sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        tasks, done = [], False
+        while not done:
+            # block for the next question, then take whatever else is already queued
+            group = [await asyncio.to_thread(question_q.get)]
+            while len(group) < group_size and not question_q.empty():
+                group.append(question_q.get_nowait())
+            if group[-1] is _DONE:
+                group.pop()
+                done = True
+            if group:
+                tasks.append(asyncio.create_task(analyze_group(sem, group)))
+        await asyncio.gather(*tasks)
+
+    def analysis_stage():
+        run_async(analyze_stream())
+
+    progress = status.progress(0)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(ocr_stage), pool.submit(split_stage), pool.submit(analysis_stage)]
+        while not all(f.done() for f in futures):
+            with lock:
+                pages, found, analyzed = counts["pages"], counts["questions"], counts["analyzed"]
+            status.update(label=f"OCR pages: {pages} · questions found: {found} · analyzed: {analyzed}")
+            progress.progress(analyzed / found if found else 0.0)
+            time.sleep(0.25)
+        for f in futures:
+            f.result()
+    progress.progress(1.0)
+    return cleaned_pages, [results[i] for i in sorted(results)]
 
 # ---------------- Main Run ----------------
 if run_button:
@@ -59,117 +304,147 @@ if run_button:
         st.error("Please upload BOTH a syllabus file and a question paper.")
         st.stop()
 
-    # 1) Parse syllabus
-    syllabus_structured = []
-    try:
-        if syllabus_file.name.endswith(".json"):
-            raw = syllabus_file.read().decode("utf-8")
-            parsed = json.loads(raw)
-            syllabus_structured = validate_syllabus_json(parsed)
-            st.success(f"Syllabus JSON loaded with {len(syllabus_structured)} subject entries.")
-
-        elif syllabus_file.name.endswith(".pdf"):
-            with st.spinner("Performing OCR on syllabus PDF..."):
-                pdf_bytes = syllabus_file.read()
-                raw_text = pdf_bytes_to_text(pdf_bytes, dpi=300)
-            # ✅ AI-based cleaning
-            cleaned_text = clean_text_with_ai(raw_text)
-            st.text_area("Syllabus OCR (AI-cleaned)", value=cleaned_text[:3000], height=220)
-            syllabus_structured = parse_syllabus_text(cleaned_text)
-            st.success(f"Extracted {len(syllabus_structured)} subject blocks.")
-
-        else:
-            with st.spinner("Performing OCR on syllabus image..."):
-                b = syllabus_file.read()
-                raw_text = image_bytes_to_text(b)
-            # ✅ AI-based cleaning
-            cleaned_text = clean_text_with_ai(raw_text)
-            st.text_area("Syllabus OCR (AI-cleaned)", value=cleaned_text[:3000], height=220)
-            syllabus_structured = parse_syllabus_text(cleaned_text)
-            st.success(f"Extracted {len(syllabus_structured)} subject blocks.")
-    except Exception as e:
-        st.error(f"Syllabus processing failed: {e}")
-        st.stop()
-
-    # 2) OCR question file
-    try:
-        if question_file.name.endswith(".json"):
-            rawq = question_file.read().decode("utf-8")
-            question_text = rawq
-
-        elif question_file.name.endswith(".pdf"):
-            with st.spinner("Performing OCR on question PDF..."):
-                pdf_bytes = question_file.read()
-                raw_qtext = pdf_bytes_to_text(pdf_bytes, dpi=300)
-            # ✅ AI-based cleaning
-            question_text = clean_text_with_ai(raw_qtext)
-            st.text_area("Question OCR (AI-cleaned)", question_text[:3000], height=220)
+    streaming = (use_pipeline and question_file.name.endswith(".pdf")
+                 and not (use_batch and batch_available()))
 
+    # 1) + 2) Syllabus and question paper are OCR'd/cleaned concurrently off the UI thread;
+    # in streaming mode the question paper goes through the page pipeline instead
+    with st.spinner("Performing OCR on syllabus and question paper..."):
+        if streaming:
+            syllabus_out, question_out = run_async(_load_inputs(syllabus_file, None))
         else:
-            with st.spinner("Performing OCR on question image..."):
-                b = question_file.read()
-                raw_qtext = image_bytes_to_text(b)
-            # ✅ AI-based cleaning
-            question_text = clean_text_with_ai(raw_qtext)
-            st.text_area("Question OCR (AI-cleaned)", question_text[:3000], height=220)
-
-    except Exception as e:
-        st.error(f"Question OCR failed: {e}")
-        st.stop()
+            syllabus_out, question_out = run_async(_load_inputs(syllabus_file, question_file))
 
-    # 3) Split questions
-    questions = split_questions_from_text(question_text)
-    if not questions:
-        st.error("No questions extracted.")
+    if isinstance(syllabus_out, Exception):
+        st.error(f"Syllabus processing failed: {syllabus_out}")
         st.stop()
-    st.success(f"Identified {len(questions)} questions.")
-
-    # 4) Analyze with Gemini
-    results = []
-    progress = st.progress(0)
-    for i, q in enumerate(questions, start=1):
+    syllabus_structured, cleaned_text = syllabus_out
+    if cleaned_text is None:
+        st.success(f"Syllabus JSON loaded with {len(syllabus_structured)} subject entries.")
+    else:
+        st.text_area("Syllabus OCR (AI-cleaned)", value=cleaned_text[:3000], height=220)
+        st.success(f"Extracted {len(syllabus_structured)} subject blocks.")
+
+    if streaming:
+        # 2) - 4) OCR, splitting and Gemini analysis overlap page by page
+        path = spool_upload(question_file)
         try:
-            analysis = analyze_question(q, syllabus_structured)
+            with st.status("Streaming question paper through OCR → split → analysis...") as status, \
+                    syllabus_context_cache(syllabus_structured) as cache_name:
+                cleaned_pages, results = run_question_pipeline(path, syllabus_structured, max_questions, status,
+                                                               cache_name, group_size=questions_per_call)
         except Exception as e:
-            analysis = {"question_text": q, "error_message": str(e)}
-        analysis["index"] = i
-
-        # Difficulty tagging
-        length = len(q.split())
-        if length < 8: analysis["difficulty"] = "Easy"
-        elif length < 15: analysis["difficulty"] = "Medium"
-        else: analysis["difficulty"] = "Hard"
-
-        # Bloom’s tagging
-        txt = q.lower()
-        if any(w in txt for w in ["define", "list", "state"]): analysis["blooms_level"] = "Remember"
-        elif any(w in txt for w in ["explain", "describe", "summarize"]): analysis["blooms_level"] = "Understand"
-        elif any(w in txt for w in ["apply", "solve", "use"]): analysis["blooms_level"] = "Apply"
-        elif any(w in txt for w in ["analyze", "differentiate", "compare"]): analysis["blooms_level"] = "Analyze"
-        elif any(w in txt for w in ["evaluate", "justify", "assess"]): analysis["blooms_level"] = "Evaluate"
-        elif any(w in txt for w in ["design", "create", "formulate"]): analysis["blooms_level"] = "Create"
-        else: analysis["blooms_level"] = "Uncategorized"
-
-        results.append(analysis)
-        progress.progress(i / len(questions))
+            st.error(f"Question OCR failed: {e}")
+            st.stop()
+        finally:
+            os.unlink(path)
+        st.text_area("Question OCR (AI-cleaned)", "\n\n".join(cleaned_pages)[:3000], height=220)
+        if not results:
+            st.error("No questions extracted.")
+            st.stop()
+        st.success(f"Identified {len(results)} questions.")
+    else:
+        if isinstance(question_out, Exception):
+            st.error(f"Question OCR failed: {question_out}")
+            st.stop()
+        question_text, from_ocr = question_out
+        if from_ocr:
+            st.text_area("Question OCR (AI-cleaned)", question_text[:3000], height=220)
+
+        # 3) Split questions
+        questions = split_questions_from_text(question_text, max_questions)
+        if not questions:
+            st.error("No questions extracted.")
+            st.stop()
+        st.success(f"Identified {len(questions)} questions.")
+
+        # 4) Analyze with Gemini
+        results = []
+        if use_batch and not batch_available():
+            st.warning("Gemini Batch API unavailable (needs google-genai + GEMINI_API_KEY) — analyzing per question.")
+        if use_batch and batch_available():
+            try:
+                with st.spinner(f"Gemini batch job running for {len(questions)} questions..."):
+                    batch_out = analyze_questions_batch(questions, syllabus_structured)
+            except Exception as e:
+                st.error(f"Gemini batch job failed: {e}")
+                st.stop()
+            for i, (q, analysis) in enumerate(zip(questions, batch_out), start=1):
+                analysis["index"] = i
+                results.append(tag_question(analysis, q))
+        else:
+            progress = st.progress(0)
+            # syllabus tokens are uploaded once per run instead of with every question
+            with syllabus_context_cache(syllabus_structured) as cache_name:
+                results = analyze_all(questions, syllabus_structured, progress, cache_name,
+                                      group_size=questions_per_call)
 
     st.session_state["processed_questions"] = results
     st.success("✅ Analysis complete!")
 
+# ---------------- Helper: Downloads ----------------
+def _write_json_rows(rows, path):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("[")
+        for i, row in enumerate(rows):
+            if i:
+                fh.write(",\n")
+            fh.write(json.dumps(row, ensure_ascii=False))
+        fh.write("]")
+
+def _write_csv_rows(rows, path):
+    if not rows:
+        return
+    if pacsv is not None:
+        try:
+            pacsv.write_csv(pa.Table.from_pylist(rows), path)
+            return
+        except Exception:
+            pass  # e.g. a column mixing numbers and "Not Found" — fall back to csv
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def _spool_rows(rows, write, suffix):
+    """Serialize rows into a temp file and return its path (caller unlinks)."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        pass
+    write(rows, tmp.name)
+    return tmp.name
+
 # ---------------- Show Results ----------------
 if "processed_questions" in st.session_state:
-    df = pd.DataFrame(st.session_state["processed_questions"])
+    df = results_frame(st.session_state["processed_questions"])
     st.subheader("📊 AI Suggested Mapping")
-    st.dataframe(df.fillna(""), height=350)
-
-    st.download_button("📥 Download Question Bank (JSON)",
-                       data=json.dumps(st.session_state["processed_questions"], indent=4),
-                       file_name="question_bank.json", mime="application/json")
+    # one virtualized grid instead of per-question widgets; reviewers correct mappings inline
+    edited_df = st.data_editor(
+        df,
+        column_config={
+            "question_type": st.column_config.SelectboxColumn(
+                options=["MCQ", "Short Answer", "Broad Answer", "Other", "Not Found"]),
+            "confidence_score": st.column_config.NumberColumn(min_value=0.0, max_value=1.0, step=0.01),
+        },
+        disabled=["index", "ai_raw_output", "error_message"],
+        height=350, use_container_width=True, key="mapping_editor",
+    )
+    edited = edited_df.to_dict("records")
+
+    for label, writer, name, mime in (
+        ("📥 Download Question Bank (JSON)", _write_json_rows, "question_bank.json", "application/json"),
+        ("📥 Download Question Bank (CSV)", _write_csv_rows, "question_bank.csv", "text/csv"),
+    ):
+        path = _spool_rows(edited, writer, os.path.splitext(name)[1])
+        try:
+            with open(path, "rb") as fh:
+                st.download_button(label, data=fh, file_name=name, mime=mime)
+        finally:
+            os.unlink(path)
 
 # ---------------- Dashboard ----------------
 if "processed_questions" in st.session_state:
     st.header("🔎 Searchable Question Bank Dashboard")
-    df = pd.DataFrame(st.session_state["processed_questions"])
+    df = results_frame(st.session_state["processed_questions"])
     search_text = st.text_input("Search Question Text")
     if search_text:
         df = df[df["question_text"].str.contains(search_text, case=False, na=False)]
@@ -181,7 +456,7 @@ if "processed_questions" in st.session_state:
 # ---------------- Visualization ----------------
 if "processed_questions" in st.session_state:
     st.header("📈 Visualization Dashboard")
-    df = pd.DataFrame(st.session_state["processed_questions"])
+    df = results_frame(st.session_state["processed_questions"])
     if not df.empty:
         fig1 = px.pie(df, names="subject_name", title="Questions per Subject")
         st.plotly_chart(fig1)
@@ -0,0 +1,69 @@
+# cache_utils.py
+import os
+import hashlib
+import functools
+import inspect
+import threading
+
+# diskcache is optional — without it results are only memoized for the lifetime of the process
+try:
+    import diskcache
+except Exception:
+    diskcache = None
+
+GEMINI_CACHE_DIR = os.getenv("GEMINI_CACHE_DIR", "./.gemini_cache")
+
+def content_key(*parts):
+    """
+    BLAKE2b digest of the given parts joined with "|" (str parts are UTF-8 encoded).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for i, p in enumerate(parts):
+        if i:
+            h.update(b"|")
+        h.update(p if isinstance(p, bytes) else str(p).encode("utf-8"))
+    return h.hexdigest()
+
+def disk_cache(directory):
+    """
+    Decorator factory: memoize fn(*args) on disk, keyed by content_key(*args).
+    Keyword arguments are passed through but are NOT part of the key.
+    Works on plain and async functions; exceptions are never cached.
+    The store is opened on the first call, not when the decorator runs, so importing a
+    module never creates its cache directory.
+    """
+    opened, lock = [], threading.Lock()
+
+    def get_store():
+        if not opened:
+            with lock:
+                if not opened:
+                    opened.append(diskcache.Cache(directory) if diskcache else {})
+        return opened[0]
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                store = get_store()
+                key = content_key(*args)
+                hit = store.get(key)
+                if hit is not None:
+                    return hit
+                result = await fn(*args, **kwargs)
+                store[key] = result
+                return result
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                store = get_store()
+                key = content_key(*args)
+                hit = store.get(key)
+                if hit is not None:
+                    return hit
+                result = fn(*args, **kwargs)
+                store[key] = result
+                return result
+        wrapper.get_cache = get_store
+        return wrapper
+    return decorator
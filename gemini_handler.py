@@ -1,10 +1,23 @@
 # gemini_handler.py
 import os
 import json
+import time
+import asyncio
+import logging
+import datetime
+import functools
+import contextlib
+import tempfile
 from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+MODEL_NAME = "gemini-2.5-pro"
+BATCH_MODEL_NAME = "gemini-2.5-flash"
+
+from cache_utils import disk_cache, GEMINI_CACHE_DIR
+
+logger = logging.getLogger(__name__)
 
 # Try import google.generativeai — if not installed the app falls back to keyword matcher
 try:
@@ -14,12 +27,38 @@ try:
 except Exception:
     genai = None
 
+# Context caching (syllabus uploaded once per run) — optional, older SDKs lack it
+try:
+    from google.generativeai import caching as genai_caching
+except Exception:
+    genai_caching = None
+
+# pyahocorasick is optional — finds every syllabus needle in a question in one linear scan
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
+# The Batch API lives in the newer google-genai SDK — optional, only needed for batch mode
+try:
+    from google import genai as genai_sdk
+except Exception:
+    genai_sdk = None
+
 import re
 
-PROMPT_TEMPLATE = """
+SHORT_ANSWER_RE = re.compile(r'\bdefine\b|\bwhat is\b|\bwhat are\b')
+BROAD_ANSWER_RE = re.compile(r'\bexplain\b|\bdescribe\b|\bdiscuss\b|\belaborate\b')
+MCQ_RE = re.compile(r'\bchoose\b|\boption\b|\bmcq\b|\ba\)\b')
+
+# The prompt is the syllabus context followed by the question(s), so the context half can be
+# uploaded once as Gemini cached content and only QUESTION_TEMPLATE / GROUP_QUESTION_TEMPLATE
+# is sent per call. The context is shared by both, so it says nothing about the output's shape
+# (one object or an array); each per-call template asks for its own.
+CONTEXT_TEMPLATE = """
 You are an expert question-to-syllabus mapper.
-Given a single question and a syllabus (as JSON list of subjects with subject, subject_code, year, semester, topics, course_outcomes),
-return a STRICT JSON object (only JSON) with the keys:
+You will be given a syllabus (as JSON list of subjects with subject, subject_code, year, semester, topics, course_outcomes)
+and then one or more questions. Map each question to the syllabus as one STRICT JSON object with the keys:
 question_text, question_type, probable_topic, course_outcome, subject_name, subject_code, year, semester, confidence_score
 
 If something cannot be determined, set its string value to "Not Found" and confidence_score to 0.0.
@@ -27,63 +66,309 @@ question_type should be one of: "MCQ", "Short Answer", "Broad Answer", "Other".
 
 Syllabus JSON:
 {syllabus_json}
+"""
 
+QUESTION_TEMPLATE = """
 Question:
 \"\"\"{question_text}\"\"\"
 
-Return only JSON.
+Return only the single JSON object for this question.
 """
 
+PROMPT_TEMPLATE = CONTEXT_TEMPLATE + QUESTION_TEMPLATE
+
+# Several questions per call: the syllabus context is sent (or cached) once per group.
+GROUP_QUESTION_TEMPLATE = """
+Map each of the following questions independently.
+Questions (JSON array of strings):
+{questions_json}
+
+Return only a JSON array with exactly one object per question, in the same order.
+"""
+GROUP_SIZE = 10                # questions per grouped Gemini call
+MAX_OUTPUT_TOKENS = 512        # per question's JSON answer
+# gemini-2.5 thinks before answering and those tokens count against max_output_tokens too
+# (as in ai_cleaner); without this allowance a call can run out before any JSON is written
+THINKING_TOKEN_BUDGET = 4096
+
+def _output_budget(n_questions=1):
+    return MAX_OUTPUT_TOKENS * n_questions + THINKING_TOKEN_BUDGET
+
+def build_prompt(question_text, syllabus):
+    """
+    Pure prompt builder shared by the per-question and batch paths.
+    The syllabus is dumped with sorted keys so the prompt (and its cache key) is stable.
+    """
+    return build_context(syllabus) + build_question_prompt(question_text)
+
+_syllabus_context = (None, None)
+
+def build_context(syllabus):
+    """
+    Syllabus half of the prompt, serialized compactly (fewer prompt tokens).
+    Single-entry cache keyed on identity, like _prepare_syllabus — a run builds
+    one prompt per question from the same syllabus list.
+    """
+    global _syllabus_context
+    cached_for, context = _syllabus_context
+    if cached_for is syllabus:
+        return context
+    syllabus_json = json.dumps(syllabus, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    context = CONTEXT_TEMPLATE.format(syllabus_json=syllabus_json)
+    _syllabus_context = (syllabus, context)
+    return context
+
+def build_question_prompt(question_text):
+    return QUESTION_TEMPLATE.format(question_text=question_text)
+
+def build_group_question_prompt(questions):
+    return GROUP_QUESTION_TEMPLATE.format(questions_json=json.dumps(list(questions), ensure_ascii=False))
+
+@contextlib.contextmanager
+def syllabus_context_cache(syllabus, model_name=MODEL_NAME, ttl_seconds=3600):
+    """
+    Upload the syllabus context once as Gemini cached content and yield its name.
+    Yields None when caching isn't possible (no SDK/key, syllabus below the model's minimum
+    cacheable size, ...) — callers then send the full prompt as before. Deleted on exit.
+    """
+    cache = None
+    if genai_caching and GEMINI_API_KEY:
+        try:
+            cache = genai_caching.CachedContent.create(
+                model=f"models/{model_name}", contents=[build_context(syllabus)],
+                ttl=datetime.timedelta(seconds=ttl_seconds),
+            )
+        except Exception:
+            cache = None
+    try:
+        yield cache.name if cache else None
+    finally:
+        if cache:
+            try:
+                cache.delete()
+            except Exception:
+                pass
+
+@functools.lru_cache(maxsize=4)
+def _get_model(name=MODEL_NAME):
+    return genai.GenerativeModel(name)
+
+@functools.lru_cache(maxsize=4)
+def _get_cached_model(cache_name):
+    return genai.GenerativeModel.from_cached_content(genai_caching.CachedContent.get(cache_name))
+
+def _check_finish(model_name, resp, max_output_tokens):
+    # a truncated (MAX_TOKENS) or blocked answer is not an answer: raise, so the caller falls
+    # back and disk_cache doesn't store it
+    finish = resp.candidates[0].finish_reason if resp.candidates else None
+    finish = getattr(finish, "name", finish)
+    logger.debug("%s finished with %s (budget %d tokens)", model_name, finish, max_output_tokens)
+    if finish not in (None, "STOP"):
+        logger.warning("%s stopped with finish_reason=%s (budget %d tokens)", model_name, finish, max_output_tokens)
+        raise RuntimeError(f"{model_name} stopped early: {finish}")
+
+def _complete_text(model_name, text):
+    # the disk cache stores whatever is returned; an empty answer (blocked prompt, no parts)
+    # must raise instead, or every rerun would be served the same failure without asking again
+    if not text or not text.strip():
+        raise RuntimeError(f"{model_name} returned no text")
+    return text
+
+@disk_cache(GEMINI_CACHE_DIR)
+def _generate_text(model_name, prompt):
+    # same model objects and generation settings as _generate_text_async, so both paths share
+    # disk-cache entries; genai.generate_text was the PaLM API and is gone from current SDKs
+    budget = _output_budget()
+    resp = _get_model(model_name).generate_content(
+        prompt, generation_config={"max_output_tokens": budget, "temperature": 0.0},
+    )
+    _check_finish(model_name, resp, budget)
+    return _complete_text(model_name, resp.text)
+
+@disk_cache(GEMINI_CACHE_DIR)
+async def _generate_text_async(model_name, prompt, question_prompt=None, cache_name=None,
+                               max_output_tokens=None):
+    # keyed on the full prompt either way (kwargs aren't hashed), so cached-context and
+    # inline calls share disk-cache entries; with a cache only the question part is sent
+    if cache_name:
+        model, prompt = _get_cached_model(cache_name), question_prompt
+    else:
+        model = _get_model(model_name)
+    max_output_tokens = max_output_tokens or _output_budget()
+    # one complete response, not a stream cut off once the JSON closes: the SDK's stream can't
+    # be closed early, and only the final chunk carries finish_reason and safety data
+    resp = await model.generate_content_async(
+        prompt, generation_config={"max_output_tokens": max_output_tokens, "temperature": 0.0},
+    )
+    _check_finish(model_name, resp, max_output_tokens)
+    return _complete_text(model_name, resp.text)
+
 def _call_gemini(question_text, syllabus):
     if not genai:
         raise RuntimeError("Gemini client not available.")
-    prompt = PROMPT_TEMPLATE.format(syllabus_json=json.dumps(syllabus, ensure_ascii=False), question_text=question_text)
-    # Use a conservative setting
+    raw = _generate_text(MODEL_NAME, build_prompt(question_text, syllabus))
+    return _parse_gemini_output(raw)
+
+async def _call_gemini_async(question_text, syllabus, cache_name=None):
+    if not genai:
+        raise RuntimeError("Gemini client not available.")
+    raw = await _generate_text_async(MODEL_NAME, build_prompt(question_text, syllabus),
+                                     question_prompt=build_question_prompt(question_text),
+                                     cache_name=cache_name)
+    return _parse_gemini_output(raw)
+
+async def _call_gemini_group_async(questions, syllabus, cache_name=None):
+    if not genai:
+        raise RuntimeError("Gemini client not available.")
+    question_prompt = build_group_question_prompt(questions)
+    raw = await _generate_text_async(MODEL_NAME, build_context(syllabus) + question_prompt,
+                                     question_prompt=question_prompt, cache_name=cache_name,
+                                     max_output_tokens=_output_budget(len(questions)))
+    return _parse_gemini_array(raw, len(questions))
+
+def _parse_gemini_array(raw, n):
+    """
+    Turn raw model text into (list_of_n_dicts, raw). Raises ValueError if no JSON array
+    of exactly n objects is found.
+    """
+    raw = raw.strip()
+
+    def valid(parsed):
+        return isinstance(parsed, list) and len(parsed) == n and all(isinstance(p, dict) for p in parsed)
+
     try:
-        resp = genai.generate_text(model="gemini-2.5-pro", prompt=prompt, max_output_tokens=512, temperature=0.0)
-    except Exception as e:
-        # try alternate API shape
+        parsed = json.loads(raw)
+        if valid(parsed):
+            return parsed, raw
+    except Exception:
+        pass
+    # as in _parse_gemini_output: a bracket in leading prose ("Sure [see below]") doesn't end
+    # the search — try each "[" until a balanced array of n objects decodes
+    start = raw.find("[")
+    while start != -1:
+        end = _json_object_end(raw, start)
+        if end is None:
+            break
         try:
-            resp = genai.generate(prompt=prompt, model="gemini-2.5-pro")
-        except Exception as e2:
-            raise
-    # response parsing
-    raw = ""
-    if hasattr(resp, "text"):
-        raw = resp.text
-    elif isinstance(resp, dict):
-        raw = resp.get("candidates", [{}])[0].get("content") or str(resp)
-    else:
-        raw = str(resp)
-    # Trim code fences
+            parsed = json.loads(raw[start:end])
+            if valid(parsed):
+                return parsed, raw
+        except json.JSONDecodeError:
+            pass
+        start = raw.find("[", start + 1)
+    raise ValueError(f"Expected a JSON array of {n} objects. Raw output: {raw[:500]}")
+
+def _parse_gemini_output(raw):
+    """
+    Turn raw model text into (parsed_dict, raw). Raises ValueError if no JSON object is found.
+    """
     raw = raw.strip()
-    if raw.startswith("```"):
-        parts = raw.split("```")
-        # find JSON-looking part
-        for p in parts:
-            if p.strip().startswith("{"):
-                raw = p
-                break
     try:
         parsed = json.loads(raw)
         return parsed, raw
     except Exception:
-        # sometimes model returns text+json — try to find JSON substring
-        m = re.search(r'(\{[\s\S]*\})', raw)
-        if m:
-            try:
-                parsed = json.loads(m.group(1))
-                return parsed, raw
-            except Exception:
-                pass
+        pass
+    # code fences / text+json — scan for a balanced {...}; try the next "{" if one doesn't decode
+    start = raw.find("{")
+    while start != -1:
+        end = _json_object_end(raw, start)
+        if end is None:
+            break
+        try:
+            return json.loads(raw[start:end]), raw
+        except json.JSONDecodeError:
+            start = raw.find("{", start + 1)
     raise ValueError(f"Unable to parse Gemini output as JSON. Raw output: {raw[:500]}")
 
+class _BracketScanner:
+    """
+    Single linear pass over text fed in pieces: track bracket depth outside JSON strings
+    (honouring backslash escapes). The first "{" or "[" opens the scan; `start` / `end`
+    are absolute offsets of the opening bracket and just past its match.
+    """
+    def __init__(self):
+        self.depth, self.in_string, self.escape = 0, False, False
+        self.start = self.end = None
+        self._pos = 0
+
+    def feed(self, text):
+        """Consume the next piece; returns `end` once the outer value has closed, else None."""
+        if self.end is not None:
+            return self.end
+        for i, c in enumerate(text, self._pos):
+            if self.start is None:
+                if c == "{" or c == "[":
+                    self.start, self.depth = i, 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = True
+            elif c == "{" or c == "[":
+                self.depth += 1
+            elif c == "}" or c == "]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = i + 1
+                    break
+        self._pos += len(text)
+        return self.end
+
+def _json_object_end(raw, start):
+    """Index just past the value whose "{" (or "[") is at `start`, or None if it never closes."""
+    end = _BracketScanner().feed(raw[start:])
+    return None if end is None else start + end
+
+_prepared_syllabus = (None, None)
+
+def _prepare_syllabus(syllabus):
+    """
+    Casefold and tokenize every subject once per syllabus instead of once per question.
+    Also builds an inverted index needle -> subject positions over every string the matcher
+    looks for, so each distinct needle is substring-checked once per question.
+    Single-entry cache keyed on identity — the app passes the same list for a whole run.
+    """
+    global _prepared_syllabus
+    cached_for, prepared = _prepared_syllabus
+    if cached_for is syllabus:
+        return prepared
+    subjects, index = [], {}
+    for pos, subj in enumerate(syllabus):
+        topics = [t.casefold() for t in subj.get("topics", [])]
+        p = {
+            "subj": subj,
+            "name_tokens": (subj.get("subject") or "").casefold().split(),
+            "code": (subj.get("subject_code") or "").casefold(),
+            "topics": [(t0, t0.split()) for t0 in topics],
+            "co_tokens": [w for c in subj.get("course_outcomes", []) for w in c.casefold().split()],
+        }
+        subjects.append(p)
+        needles = p["name_tokens"] + p["co_tokens"] + [p["code"]]
+        for t0, words in p["topics"]:
+            needles += [t0] + words
+        for n in needles:
+            if n:
+                index.setdefault(n, set()).add(pos)
+    automaton = None
+    if ahocorasick and index:
+        automaton = ahocorasick.Automaton()
+        for n in index:
+            automaton.add_word(n, n)
+        automaton.make_automaton()
+    prepared = {"subjects": subjects, "index": index, "automaton": automaton}
+    _prepared_syllabus = (syllabus, prepared)
+    return prepared
+
 def _keyword_matcher(question_text, syllabus):
     """
     Simple fallback: find best subject/topic by counting keyword occurrence.
     Returns a mapping dict similar to Gemini output but with lower confidence.
     """
-    qlow = question_text.lower()
+    qlow = question_text.casefold()
     best = {
         "question_text": question_text,
         "question_type": "Other",
@@ -96,42 +381,43 @@ def _keyword_matcher(question_text, syllabus):
         "confidence_score": 0.0
     }
     # simple heuristics for question type
-    if re.search(r'\bdefine\b|\bwhat is\b|\bwhat are\b', qlow):
+    if SHORT_ANSWER_RE.search(qlow):
         best["question_type"] = "Short Answer"
-    if re.search(r'\bexplain\b|\bdescribe\b|\bdiscuss\b|\belaborate\b', qlow):
+    if BROAD_ANSWER_RE.search(qlow):
         best["question_type"] = "Broad Answer"
-    if re.search(r'\bchoose\b|\boption\b|\bmcq\b|\ba\)\b', qlow):
+    if MCQ_RE.search(qlow):
         best["question_type"] = "MCQ"
 
     # scan syllabus topics and subject names
     max_score = 0
-    for subj in syllabus:
+    prepared = _prepare_syllabus(syllabus)
+    index = prepared["index"]
+    if prepared["automaton"] is not None:
+        # reports overlapping matches too, so this is exactly the set of needles in qlow
+        present = {n for _, n in prepared["automaton"].iter(qlow)}
+    else:
+        present = {n for n in index if n in qlow}
+    # a subject sharing no needle with the question scores 0 and can never win — skip it;
+    # candidates stay in syllabus order so ties resolve as before
+    candidates = sorted(set().union(*(index[n] for n in present)))
+    for pos in candidates:
+        p = prepared["subjects"][pos]
+        subj = p["subj"]
         score = 0
         # match subject name & code
-        if subj.get("subject"):
-            name = subj["subject"].lower()
-            for tok in name.split():
-                if tok and tok in qlow:
-                    score += 2
-        if subj.get("subject_code") and subj["subject_code"].lower() in qlow:
+        score += 2 * sum(1 for tok in p["name_tokens"] if tok in present)
+        if p["code"] in present:
             score += 2
         # topics
-        for t in subj.get("topics", []):
-            t0 = t.lower()
+        for t0, words in p["topics"]:
             # check if topic phrase appears
-            if t0 and t0 in qlow:
+            if t0 in present:
                 score += 5
             else:
                 # partial token match
-                for w in t0.split():
-                    if w and w in qlow:
-                        score += 1
+                score += sum(1 for w in words if w in present)
         # course outcomes
-        for c in subj.get("course_outcomes", []):
-            c0 = c.lower()
-            for w in c0.split():
-                if w and w in qlow:
-                    score += 1
+        score += sum(1 for w in p["co_tokens"] if w in present)
         if score > max_score:
             max_score = score
             best["subject_name"] = subj.get("subject") or "Not Found"
@@ -144,12 +430,8 @@ def _keyword_matcher(question_text, syllabus):
     best["confidence_score"] = min(0.95, 0.1 + max_score*0.05)
     return best
 
-def analyze_question(question_text, syllabus):
-    """
-    Main wrapper. Tries Gemini if configured, otherwise fallback to keyword matcher.
-    Returns a dict with the fields described.
-    """
-    out = {
+def _empty_result(question_text):
+    return {
         "question_text": question_text,
         "question_type": "Not Found",
         "probable_topic": "Not Found",
@@ -159,30 +441,140 @@ def analyze_question(question_text, syllabus):
         "year": "Not Found",
         "semester": "Not Found",
         "confidence_score": 0.0,
-        "ai_raw_output": None,
-        "error_message": None
+        "ai_raw_output": "",
+        "error_message": ""
     }
+
+def _apply_gemini_output(out, parsed, raw):
+    out.update({k: parsed.get(k, out[k]) for k in out.keys() if k in parsed})
+    out["ai_raw_output"] = raw
+    try:
+        out["confidence_score"] = float(parsed.get("confidence_score", out["confidence_score"]))
+    except Exception:
+        out["confidence_score"] = out.get("confidence_score", 0.0)
+    return out
+
+def _apply_fallback(out, question_text, syllabus):
+    try:
+        kb = _keyword_matcher(question_text, syllabus)
+        out.update(kb)
+    except Exception as e:
+        out["error_message"] = f"Fallback matcher error: {e}"
+    return out
+
+def analyze_question(question_text, syllabus):
+    """
+    Main wrapper. Tries Gemini if configured, otherwise fallback to keyword matcher.
+    Returns a dict with the fields described.
+    """
+    out = _empty_result(question_text)
     # prefer Gemini if configured
     if genai and GEMINI_API_KEY:
         try:
             parsed, raw = _call_gemini(question_text, syllabus)
-            out.update({k: parsed.get(k, out[k]) for k in out.keys() if k in parsed})
-            out["ai_raw_output"] = raw
-            try:
-                out["confidence_score"] = float(parsed.get("confidence_score", out["confidence_score"]))
-            except Exception:
-                out["confidence_score"] = out.get("confidence_score", 0.0)
-            return out
+            return _apply_gemini_output(out, parsed, raw)
         except Exception as e:
             out["error_message"] = f"Gemini error: {e}"
             # fallback to keyword matcher
     # fallback
+    return _apply_fallback(out, question_text, syllabus)
+
+async def analyze_question_async(question_text, syllabus, cache_name=None):
+    """
+    Async twin of analyze_question — awaits the Gemini call so many questions can be
+    in flight at once. Same output shape and keyword-matcher fallback.
+    cache_name is an optional syllabus_context_cache handle.
+    """
+    out = _empty_result(question_text)
+    if genai and GEMINI_API_KEY:
+        try:
+            parsed, raw = await _call_gemini_async(question_text, syllabus, cache_name)
+            return _apply_gemini_output(out, parsed, raw)
+        except Exception as e:
+            out["error_message"] = f"Gemini error: {e}"
+    # the keyword matcher is blocking CPU work — keep it off the event loop
+    return await asyncio.to_thread(_apply_fallback, out, question_text, syllabus)
+
+async def analyze_question_group_async(questions, syllabus, cache_name=None):
+    """
+    Map several questions with ONE Gemini call (the model returns a JSON array in input
+    order). If the grouped answer can't be parsed, each question is retried on its own
+    through analyze_question_async. Returns one analysis dict per question.
+    """
+    if len(questions) == 1 or not (genai and GEMINI_API_KEY):
+        return [await analyze_question_async(q, syllabus, cache_name) for q in questions]
     try:
-        kb = _keyword_matcher(question_text, syllabus)
-        out.update(kb)
-    except Exception as e:
-        out["error_message"] = f"Fallback matcher error: {e}"
-    return out
+        parsed, raw = await _call_gemini_group_async(questions, syllabus, cache_name)
+    except Exception:
+        return list(await asyncio.gather(*[analyze_question_async(q, syllabus, cache_name) for q in questions]))
+    # each row keeps just its own object as ai_raw_output, not the whole group's text
+    return [_apply_gemini_output(_empty_result(q), p, json.dumps(p, ensure_ascii=False))
+            for q, p in zip(questions, parsed)]
+
+# ---------------- Gemini Batch API ----------------
+_BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+def batch_available():
+    return bool(genai_sdk and GEMINI_API_KEY)
+
+def _batch_response_text(response):
+    """Pull the model text out of one batch result line's `response` object."""
+    parts = (response.get("candidates") or [{}])[0].get("content", {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts)
+
+def analyze_questions_batch(questions, syllabus, poll_interval=15, model=BATCH_MODEL_NAME):
+    """
+    Submit all questions as ONE Gemini Batch API job (asynchronous, ~50% cheaper than
+    per-question calls), block until it finishes, and return one analysis dict per question
+    in input order. Questions the job could not answer go through the keyword matcher.
+    """
+    if not batch_available():
+        raise RuntimeError("Gemini Batch API not available (install google-genai and set GEMINI_API_KEY).")
+    client = genai_sdk.Client(api_key=GEMINI_API_KEY)
+
+    # 1) one JSONL line per question, keyed so results can be matched back
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+        for i, q in enumerate(questions):
+            line = {"key": f"q_{i}", "request": {"contents": [{"parts": [{"text": build_prompt(q, syllabus)}]}]}}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        src_path = f.name
+    try:
+        uploaded = client.files.upload(file=src_path, config={"display_name": "batch_requests", "mime_type": "jsonl"})
+    finally:
+        os.unlink(src_path)
+
+    # 2) create the job and poll until it reaches a terminal state
+    job = client.batches.create(model=model, src=uploaded.name, config={"display_name": "question-analysis"})
+    while job.state.name not in _BATCH_DONE_STATES:
+        time.sleep(poll_interval)
+        job = client.batches.get(name=job.name)
+
+    # 3) download the result file and distribute answers back by key
+    answers = {}
+    if job.state.name == "JOB_STATE_SUCCEEDED":
+        content = client.files.download(file=job.dest.file_name)
+        for line in content.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            answers[item.get("key")] = item
+
+    results = []
+    for i, q in enumerate(questions):
+        out = _empty_result(q)
+        item = answers.get(f"q_{i}")
+        if item and item.get("response"):
+            try:
+                parsed, raw = _parse_gemini_output(_batch_response_text(item["response"]))
+                results.append(_apply_gemini_output(out, parsed, raw))
+                continue
+            except Exception as e:
+                out["error_message"] = f"Gemini error: {e}"
+        else:
+            err = (item or {}).get("error") or job.state.name
+            out["error_message"] = f"Gemini batch error: {err}"
+        results.append(_apply_fallback(out, q, syllabus))
+    return results
 
 
 
@@ -0,0 +1,33 @@
+# loop_utils.py
+import asyncio
+import threading
+
+# One event loop for the whole process, run by a daemon thread. The Gemini SDK creates its
+# grpc-aio client once and it stays bound to the loop it first ran on, so every coroutine that
+# may reach it is run here; a fresh asyncio.run() per call would strand it on a closed loop.
+_loop = None
+_lock = threading.Lock()
+
+def _get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="shared-event-loop", daemon=True).start()
+        return _loop
+
+def submit(coro):
+    """Schedule coro on the shared loop from any thread; returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+def run_async(coro):
+    """Blocking: run coro on the shared loop and return its result. Drop-in for asyncio.run."""
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_async() called on the shared loop itself; await the coroutine instead")
+    return submit(coro).result()
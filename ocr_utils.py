@@ -2,11 +2,97 @@
 # ocr_utils.py
 import os
 import io
+import hashlib
+import functools
+import contextlib
+import tempfile
+import threading
+import multiprocessing
 import pytesseract
 import cv2
 import numpy as np
 from PIL import Image
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_path
+from cache_utils import disk_cache
+
+# PyMuPDF is optional — renders pages in-process instead of forking pdftoppm per page
+try:
+    import fitz
+except Exception:
+    fitz = None
+
+# tesserocr is optional — an in-process Tesseract API kept alive across pages instead of
+# one tesseract subprocess (and language-model load) per image_to_string call
+try:
+    import tesserocr
+except Exception:
+    tesserocr = None
+
+# OCR output persisted by file content — identical uploads never hit Tesseract twice
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "./.ocr_cache")
+
+# vLLM is optional — with a CUDA device and OCR_VLM_MODEL set, PDF pages are OCR'd by a VLM in batches
+try:
+    import torch
+    from vllm import LLM, SamplingParams
+except Exception:
+    torch = LLM = SamplingParams = None
+
+OCR_VLM_MODEL = os.getenv("OCR_VLM_MODEL", "")
+VLM_DPI = 200
+VLM_MAX_SIDE = 1024       # uniform long edge so a page batch shares one forward pass
+VLM_BATCH_PAGES = 16      # pages rasterized and sent per generate call
+VLM_PROMPT = "Transcribe all text on this page exactly, preserving line breaks and question numbering."
+
+# pypdf is optional — when present, pages that already carry a text layer skip OCR entirely
+try:
+    import pypdf
+except Exception:
+    pypdf = None
+
+TEXT_LAYER_MIN_CHARS = 200    # per page; sparser text layers are treated as image-only
+# a page drawn as one image covering this share of it is a scan, whatever its text layer says:
+# scanners and "searchable PDF" tools put an invisible, often garbled, OCR layer over the image
+SCAN_IMAGE_COVERAGE = 0.8
+
+# pdftoppm threads for multi-page renders (VLM batches)
+RASTER_THREADS = os.cpu_count() or 1
+# Tesseract is CPU-bound and pages are independent — OCR them in a process pool
+OCR_PROCESSES = os.cpu_count() or 1
+# workers are spawned, never forked: the app builds the pool from a worker thread while the
+# shared event loop and google-generativeai's gRPC threads are running, and forking a process
+# with live threads can deadlock the child (gRPC doesn't support fork without opting in)
+OCR_POOL_CONTEXT = multiprocessing.get_context("spawn")
+# Tesseract's own OpenMP threads per pooled worker; the pool already fills every core.
+# libgomp reads OMP_THREAD_LIMIT once, when it is loaded (importing tesserocr, or each tesseract
+# CLI run), so it is put in the environment the workers are spawned with, not set inside them.
+# The parent process keeps its own setting: single-page OCR there may use every core
+OCR_WORKER_OMP_THREADS = "1"
+
+# Tesseract time scales with pixel count — larger images of unknown resolution (photos, scans
+# uploaded as images) are downscaled to this longest side. PDF pages are rendered at the
+# requested DPI and left alone: that DPI is already the size/speed trade-off
+OCR_MAX_SIDE = 2000
+
+# preprocess_image denoiser: "gaussian" (3x3 blur, cheap) or "bilateral" (edge-preserving, O(d²) per pixel)
+OCR_DENOISE = os.getenv("OCR_DENOISE", "gaussian")
+# OpenCV CUDA build with a device: the opt-in bilateral denoiser runs on the GPU
+try:
+    CV2_CUDA = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except Exception:
+    CV2_CUDA = False
+
+# adaptive threshold window; the Gaussian weighting costs O(block) per pixel. C rises with
+# the smaller window to keep the same contrast margin
+ADAPTIVE_BLOCK_SIZE = 15
+ADAPTIVE_C = 4
+
+# printed text is near-saturated at 200 DPI and pixel work grows with DPI²
+DEFAULT_PDF_DPI = 200
+# dpi="auto": probe page 1 at low resolution and only re-render higher if Tesseract is unsure
+AUTO_DPI_PROBE = 150
+AUTO_DPI_FALLBACK = 250
+AUTO_DPI_MIN_CONF = 75
 
 # ---- Set Tesseract Path (Windows) ----
 
@@ -20,14 +106,20 @@ def ensure_tesseract(path_override=""):
       2. env var
       3. common system locations
     """
+    path = _resolve_tesseract(path_override)
+    if path:
+        pytesseract.pytesseract.tesseract_cmd = path
+    return pytesseract.pytesseract.tesseract_cmd
+
+@functools.lru_cache(maxsize=4)
+def _resolve_tesseract(path_override):
+    # Streamlit reruns the script on every interaction — probe the filesystem once per override
     if path_override and os.path.exists(path_override):
-        pytesseract.pytesseract.tesseract_cmd = path_override
-        return pytesseract.pytesseract.tesseract_cmd
+        return path_override
 
     env_path = os.environ.get("TESSERACT_CMD") or os.environ.get("TESSERACT_PATH")
     if env_path and os.path.exists(env_path):
-        pytesseract.pytesseract.tesseract_cmd = env_path
-        return pytesseract.pytesseract.tesseract_cmd
+        return env_path
 
     common = [
         r"C:\Program Files\Tesseract-OCR\tesseract.exe",
@@ -37,60 +129,358 @@ def ensure_tesseract(path_override=""):
     ]
     for p in common:
         if os.path.exists(p):
-            pytesseract.pytesseract.tesseract_cmd = p
             return p
 
-    return pytesseract.pytesseract.tesseract_cmd
+    return None
 
-def preprocess_image(img_cv, use_adaptive=True):
+def preprocess_image(img_cv, use_adaptive=True, denoise=None):
     """
-    Preprocess OpenCV image to improve OCR accuracy.
+    Preprocess OpenCV image (BGR or already-grayscale) to improve OCR accuracy.
     Steps:
-      - Convert grayscale
-      - Denoise
+      - Convert grayscale (skipped for 2-D input)
+      - Denoise (denoise="gaussian" | "bilateral", default OCR_DENOISE)
       - Adaptive thresholding (or Otsu)
-      - Morphological noise removal
     """
-    gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
-    denoised = cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
+    gray = img_cv if img_cv.ndim == 2 else cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
+    if (denoise or OCR_DENOISE) == "bilateral":
+        denoised = _bilateral(gray)
+    else:
+        # the adaptive threshold below only needs speckle suppression, not edge preservation
+        denoised = cv2.GaussianBlur(gray, (3, 3), 0)
 
     if use_adaptive:
         processed = cv2.adaptiveThreshold(
             denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 31, 2
+            cv2.THRESH_BINARY, ADAPTIVE_BLOCK_SIZE, ADAPTIVE_C
         )
     else:
         _, processed = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-    kernel = np.ones((1, 1), np.uint8)
-    processed = cv2.morphologyEx(processed, cv2.MORPH_OPEN, kernel)
-
     return processed
 
+def _bilateral(gray):
+    if CV2_CUDA:
+        try:
+            gpu = cv2.cuda_GpuMat()
+            gpu.upload(gray)
+            return cv2.cuda.bilateralFilter(gpu, 9, 75, 75).download()
+        except Exception:
+            pass  # e.g. out of device memory — the CPU filter gives the same result
+    return cv2.bilateralFilter(gray, d=9, sigmaColor=75, sigmaSpace=75)
+
+def _tesseract_config(dpi=None):
+    # LSTM engine only: skips loading the legacy classifier, which we never want anyway
+    return f"--oem 1 --psm 6 --dpi {dpi}" if dpi else "--oem 1 --psm 6"
+
+def _preprocess_pil(img):
+    # PIL's "L" uses the same ITU-R 601 luma weights as COLOR_BGR2GRAY, in one pass
+    return preprocess_image(np.asarray(img if img.mode == "L" else img.convert("L")))
+
+def _downscale(img, dpi=None):
+    """Cap the longest side at OCR_MAX_SIDE unless dpi was chosen explicitly; returns (image, dpi)."""
+    side = max(img.size)
+    if dpi or side <= OCR_MAX_SIDE:
+        return img, dpi
+    scale = OCR_MAX_SIDE / side
+    img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+    return img, None
+
+_tess_local = threading.local()
+
+def _tesserocr_api(lang):
+    # PyTessBaseAPI isn't thread-safe: one per thread (and per process in the OCR pool).
+    # psm/oem mirror _tesseract_config
+    apis = _tess_local.__dict__.setdefault("apis", {})
+    if lang not in apis:
+        apis[lang] = tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.SINGLE_BLOCK,
+                                             oem=tesserocr.OEM.LSTM_ONLY)
+    return apis[lang]
+
+@disk_cache(OCR_CACHE_DIR)
+def _tesseract_cached(digest, shape, lang, config, backend, processed=None, dpi=None):
+    # backend (see _tesseract_backend) is unused here, it's there for the key: the tesserocr
+    # API and the tesseract CLI don't produce identical text, so neither serves the other's entries
+    if tesserocr:
+        api = _tesserocr_api(lang)
+        api.SetImage(Image.fromarray(processed))
+        if dpi:
+            api.SetSourceResolution(dpi)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(processed, lang=lang, config=config)
+
+def _ocr_pil_image(img, lang="eng", dpi=None):
+    """
+    Downscale and preprocess a PIL image and run Tesseract on it. Results are cached by
+    BLAKE2b of the binarized pixels, so a page seen before (a cover sheet, a re-scan of
+    the same page) skips Tesseract even inside a different file.
+    """
+    if img.mode != "L":
+        img = img.convert("L")  # before resizing: 1 byte per pixel, and LANCZOS works for any source mode
+    img, dpi = _downscale(img, dpi)
+    processed = _preprocess_pil(img)
+    digest = hashlib.blake2b(processed.tobytes(), digest_size=16).hexdigest()
+    return _tesseract_cached(digest, processed.shape, lang, _tesseract_config(dpi), _tesseract_backend(),
+                             processed=processed, dpi=dpi)
+
+def _mean_confidence(processed, lang="eng", dpi=None):
+    data = pytesseract.image_to_data(processed, lang=lang, config=_tesseract_config(dpi),
+                                     output_type=pytesseract.Output.DICT)
+    confs = [float(c) for c in data["conf"] if float(c) >= 0]
+    return sum(confs) / len(confs) if confs else 0.0
+
+def pick_pdf_dpi(pdf_path, lang="eng"):
+    """
+    Render page 1 at AUTO_DPI_PROBE and score it with Tesseract's word confidences.
+    Typed papers are usually fine at the probe resolution; otherwise fall back to AUTO_DPI_FALLBACK.
+    """
+    page = render_pdf_page(pdf_path, 1, AUTO_DPI_PROBE)
+    conf = _mean_confidence(_preprocess_pil(page), lang, AUTO_DPI_PROBE)
+    return AUTO_DPI_PROBE if conf >= AUTO_DPI_MIN_CONF else AUTO_DPI_FALLBACK
+
 def image_bytes_to_text(image_bytes, lang="eng"):
     """Extract text from image bytes (JPG/PNG)."""
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-    processed = preprocess_image(img_cv)
-    text = pytesseract.image_to_string(processed, lang=lang, config="--oem 3 --psm 6")
-    return text
-
-def pdf_bytes_to_text(pdf_bytes, dpi=300, lang="eng", max_pages=None):
-    """Extract text from PDF (multi-page)."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        return _ocr_pil_image(img, lang)
+
+def image_path_to_text(image_path, lang="eng"):
+    """Extract text from an image file on disk (JPG/PNG)."""
+    with Image.open(image_path) as img:
+        return _ocr_pil_image(img, lang)
+
+def vlm_available():
+    return bool(LLM and OCR_VLM_MODEL and torch.cuda.is_available())
+
+@functools.lru_cache(maxsize=1)
+def _get_vlm():
+    return LLM(model=OCR_VLM_MODEL, limit_mm_per_prompt={"image": 1})
+
+def _vlm_ocr_images(images, lang="eng", fallback=None):
+    """
+    OCR a batch of PIL pages in a single vLLM generate call. On failure page i goes to
+    fallback(i) (iter_pdf_pages re-renders it at the Tesseract DPI), else to Tesseract as-is.
+    """
+    for img in images:
+        img.thumbnail((VLM_MAX_SIDE, VLM_MAX_SIDE))
+    conversations = [
+        [{"role": "user", "content": [{"type": "image_pil", "image_pil": img},
+                                      {"type": "text", "text": VLM_PROMPT}]}]
+        for img in images
+    ]
     try:
-        pages = convert_from_bytes(pdf_bytes, dpi=dpi)
+        outputs = _get_vlm().chat(conversations, SamplingParams(max_tokens=2048, temperature=0.0))
+        return [o.outputs[0].text for o in outputs]
+    except Exception:
+        if fallback:
+            return [fallback(i) for i in range(len(images))]
+        return [_ocr_pil_image(img, lang) for img in images]
+
+_fitz_local = threading.local()
+
+def _open_fitz(pdf_path):
+    # one open document per thread (and per pool worker), reused across that file's pages;
+    # stat fields are part of the key so a reused temp path never hits a stale document
+    st = os.stat(pdf_path)
+    key = (pdf_path, st.st_mtime_ns, st.st_size)
+    cached = getattr(_fitz_local, "doc", None)
+    if cached and cached[0] == key:
+        return cached[1]
+    _close_fitz()
+    doc = fitz.open(pdf_path)
+    _fitz_local.doc = (key, doc)
+    return doc
+
+def _close_fitz():
+    # releases the file handle, so callers can unlink the PDF (Windows refuses while it's open)
+    cached = getattr(_fitz_local, "doc", None)
+    if cached:
+        _fitz_local.doc = None
+        cached[1].close()
+
+def render_pdf_page(pdf_path, k, dpi):
+    """Rasterize 1-based page k to a PIL image — PyMuPDF (grayscale) when installed, else poppler."""
+    if fitz:
+        pix = _open_fitz(pdf_path)[k - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    return convert_from_path(pdf_path, dpi=dpi, first_page=k, last_page=k)[0]
+
+def _init_ocr_worker(tesseract_cmd):
+    # spawned workers don't inherit ensure_tesseract()'s setting
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+_pool_env_lock = threading.Lock()
+
+@contextlib.contextmanager
+def _worker_omp_limit():
+    # spawned children copy os.environ when they start, before they import ocr_utils (and with
+    # it tesserocr/libgomp), so the limit is only set while the pool starts its workers.
+    # N workers x N OpenMP threads each would thrash; an explicit user setting still wins
+    with _pool_env_lock:
+        preset = "OMP_THREAD_LIMIT" in os.environ
+        if not preset:
+            os.environ["OMP_THREAD_LIMIT"] = OCR_WORKER_OMP_THREADS
+        try:
+            yield
+        finally:
+            if not preset:
+                del os.environ["OMP_THREAD_LIMIT"]
+
+def _raster_and_ocr_page(args):
+    # runs inside a pool worker: render one page and OCR it, so rasterization and OCR of
+    # different pages overlap across cores and only one page image per worker is alive
+    pdf_path, k, dpi, lang = args
+    page = render_pdf_page(pdf_path, k, dpi)
+    return _ocr_pil_image(page, lang, dpi)
+
+def _ocr_pool(num_pages):
+    if num_pages < 2 or OCR_PROCESSES < 2:
+        return contextlib.nullcontext(None)
+    # Pool starts all of its workers in the constructor
+    with _worker_omp_limit():
+        return OCR_POOL_CONTEXT.Pool(min(OCR_PROCESSES, num_pages), initializer=_init_ocr_worker,
+                                     initargs=(pytesseract.pytesseract.tesseract_cmd,))
+
+def _page_text_unless_scanned(page):
+    # one extract_text pass; the visitor sees every "Do" with its transformation matrix, and an
+    # image XObject is drawn into the unit square, so |det(cm)| is its area on the page
+    xobjects = page.get("/Resources", {}).get("/XObject", {})
+    largest = [0.0]
+    def visit(op, args, cm, tm):
+        if op == b"Do" and args and args[0] in xobjects and xobjects[args[0]].get_object().get("/Subtype") == "/Image":
+            largest[0] = max(largest[0], abs(cm[0] * cm[3] - cm[1] * cm[2]))
+    text = page.extract_text(visitor_operand_before=visit if xobjects else None) or ""
+    box = page.mediabox
+    area = float(box.width) * float(box.height)
+    return "" if area and largest[0] >= SCAN_IMAGE_COVERAGE * area else text
+
+def pdf_text_layer(pdf_path, num_pages):
+    """
+    Embedded text of the first num_pages pages, or None if unavailable. Image-only pages, and
+    scans whose text layer sits over one page-sized image, come back as "" so they get OCR'd.
+    """
+    if not pypdf:
+        return None
+    try:
+        reader = pypdf.PdfReader(pdf_path)
+        return [_page_text_unless_scanned(reader.pages[k]) for k in range(min(num_pages, len(reader.pages)))]
+    except Exception:
+        return None
+
+def iter_pdf_pages(pdf_path, dpi=DEFAULT_PDF_DPI, lang="eng", max_pages=None):
+    """
+    Yield (text, ocred) page by page from a PDF on disk.
+    Pages with a usable text layer are returned as-is (ocred=False); only image-only pages
+    (including scans with a hidden OCR layer, see pdf_text_layer) are OCR'd, by an OCR_PROCESSES-wide process pool in which each worker rasterizes and OCRs its
+    own page; results are yielded in page order as they complete. With a GPU VLM available,
+    OCR pages are rasterized and recognized VLM_BATCH_PAGES at a time instead.
+    dpi="auto" picks the Tesseract resolution from the first page (see pick_pdf_dpi).
+    The PyMuPDF document used for rendering is closed once the pages are exhausted.
+    """
+    try:
+        yield from _iter_pdf_pages(pdf_path, dpi, lang, max_pages)
+    finally:
+        # pool workers exit with their pool; this closes the document the calling thread opened
+        _close_fitz()
+
+def _iter_pdf_pages(pdf_path, dpi, lang, max_pages):
+    try:
+        num_pages = pdfinfo_from_path(pdf_path)["Pages"]
     except Exception as e:
         raise RuntimeError(f"PDF->image conversion failed: {e}")
+    if max_pages:
+        num_pages = min(num_pages, max_pages)
+
+    layer = pdf_text_layer(pdf_path, num_pages) or []
+    layer += [""] * (num_pages - len(layer))
+    if sum(len(t.strip()) for t in layer) >= TEXT_LAYER_MIN_CHARS * num_pages:
+        # machine-text PDF: no rasterization at all
+        yield from ((t, False) for t in layer)
+        return
+    needs_ocr = [len(t.strip()) < TEXT_LAYER_MIN_CHARS for t in layer]
+
+    if vlm_available():
+        tess_dpi = []  # resolved on the first fallback only: "auto" costs a probe render + OCR
+
+        def tesseract_page(k):
+            # the VLM batch failed: the images it had are VLM_MAX_SIDE thumbnails, so render
+            # the page again at the Tesseract DPI, as the non-VLM path would
+            if not tess_dpi:
+                tess_dpi.append(pick_pdf_dpi(pdf_path, lang) if dpi == "auto" else dpi)
+            return _raster_and_ocr_page((pdf_path, k, tess_dpi[0], lang))
+
+        for first in range(1, num_pages + 1, VLM_BATCH_PAGES):
+            last = min(first + VLM_BATCH_PAGES - 1, num_pages)
+            if any(needs_ocr[first - 1:last]):
+                images = convert_from_path(pdf_path, dpi=VLM_DPI, first_page=first, last_page=last,
+                                           thread_count=RASTER_THREADS)
+                pages = [k for k in range(first, last + 1) if needs_ocr[k - 1]]
+                texts = iter(_vlm_ocr_images([images[k - first] for k in pages], lang,
+                                             fallback=lambda i: tesseract_page(pages[i])))
+            for k in range(first, last + 1):
+                yield (next(texts), True) if needs_ocr[k - 1] else (layer[k - 1], False)
+        return
+    if dpi == "auto":
+        dpi = pick_pdf_dpi(pdf_path, lang)
+    jobs = [(pdf_path, k, dpi, lang) for k in range(1, num_pages + 1) if needs_ocr[k - 1]]
+    with _ocr_pool(len(jobs)) as pool:
+        texts = (pool.imap if pool else map)(_raster_and_ocr_page, jobs)
+        for k in range(1, num_pages + 1):
+            yield (next(texts), True) if needs_ocr[k - 1] else (layer[k - 1], False)
+
+def iter_pdf_pages_text(pdf_path, dpi=DEFAULT_PDF_DPI, lang="eng", max_pages=None):
+    """Yield text page by page from a PDF on disk (see iter_pdf_pages)."""
+    for text, _ in iter_pdf_pages(pdf_path, dpi=dpi, lang=lang, max_pages=max_pages):
+        yield text
+
+def path_digest(path):
+    """BLAKE2b of a file's bytes, read in 1 MiB chunks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _tesseract_backend():
+    # engine, flags and preprocessing are part of the key, so changing them doesn't serve stale OCR text
+    engine = "tesserocr" if tesserocr else "tesseract"
+    return f"{engine}:{_tesseract_config()}:{OCR_DENOISE}:{ADAPTIVE_BLOCK_SIZE}/{ADAPTIVE_C}"
+
+def _ocr_backend():
+    return "vlm:" + OCR_VLM_MODEL if vlm_available() else _tesseract_backend()
+
+@disk_cache(OCR_CACHE_DIR)
+def _cached_pdf_pages(digest, backend, dpi, lang, max_pages, pdf_path=None):
+    return list(iter_pdf_pages(pdf_path, dpi=dpi, lang=lang, max_pages=max_pages))
 
-    all_text = []
-    for i, img in enumerate(pages):
-        if max_pages and i >= max_pages:
-            break
-        img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-        processed = preprocess_image(img_cv)
-        text = pytesseract.image_to_string(processed, lang=lang, config="--oem 3 --psm 6")
-        all_text.append(text)
-    return "\n\n".join(all_text)
+@disk_cache(OCR_CACHE_DIR)
+def _cached_image_text(digest, backend, lang, image_path=None):
+    return image_path_to_text(image_path, lang)
+
+def pdf_pages_cached(pdf_path, dpi=DEFAULT_PDF_DPI, lang="eng", max_pages=None):
+    """
+    iter_pdf_pages as a list, persisted on disk keyed by content digest + OCR settings
+    (the path itself is not part of the key). Delete OCR_CACHE_DIR to invalidate.
+    """
+    return _cached_pdf_pages(path_digest(pdf_path), _ocr_backend(), dpi, lang, max_pages, pdf_path=pdf_path)
+
+def image_text_cached(image_path, lang="eng"):
+    """image_path_to_text, persisted on disk keyed by content digest."""
+    return _cached_image_text(path_digest(image_path), _tesseract_backend(), lang, image_path=image_path)
+
+def pdf_path_to_text(pdf_path, dpi=DEFAULT_PDF_DPI, lang="eng", max_pages=None):
+    """Extract text from a PDF file on disk (multi-page), one page in memory at a time."""
+    return "\n\n".join(iter_pdf_pages_text(pdf_path, dpi=dpi, lang=lang, max_pages=max_pages))
+
+def pdf_bytes_to_text(pdf_bytes, dpi=DEFAULT_PDF_DPI, lang="eng", max_pages=None):
+    """
+    Extract text from PDF (multi-page). The bytes are written to a temp file so they take
+    the same path as pdf_path_to_text: text-layer fast path and page-parallel OCR pool.
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(pdf_bytes)
+    try:
+        return pdf_path_to_text(tmp.name, dpi=dpi, lang=lang, max_pages=max_pages)
+    finally:
+        os.unlink(tmp.name)
 
 
 
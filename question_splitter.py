@@ -0,0 +1,66 @@
+# question_splitter.py
+import re
+
+# Hyperscan is optional — if installed, question delimiters are found in a single DFA pass
+try:
+    import hyperscan
+except Exception:
+    hyperscan = None
+
+# every question starts at one of these; the old inner "\n<digits>." split was a subset of it
+_QUESTION_START = re.compile(r'\n\s*(?=(?:\d{1,3}\.|Q\.\s*\d{1,3}|\d{1,3}\)))')
+_CR_TO_LF = str.maketrans({"\r": "\n"})
+
+def _build_delimiter_db():
+    if not hyperscan:
+        return None
+    exprs = [rb'\n\s*\d{1,3}\.', rb'\n\s*Q\.\s*\d{1,3}', rb'\n\s*\d{1,3}\)']
+    try:
+        db = hyperscan.Database()
+        db.compile(expressions=exprs, ids=list(range(len(exprs))), elements=len(exprs),
+                   flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(exprs))
+        return db
+    except Exception:
+        return None
+
+_DELIMITER_DB = _build_delimiter_db()
+
+def _split_with_hyperscan(text):
+    # collect every delimiter start offset in one scan, then slice the buffer on them
+    data = text.encode("utf-8")
+    starts = []
+    _DELIMITER_DB.scan(data, match_event_handler=lambda id_, start, end, flags, ctx: starts.append(start))
+    cuts = [0] + sorted(set(starts)) + [len(data)]
+    pieces = (data[a:b].decode("utf-8").strip() for a, b in zip(cuts, cuts[1:]))
+    return [p for p in pieces if p]
+
+def split_questions_from_text(text, limit):
+    if not text or text.strip() == "":
+        return []
+    text = text.translate(_CR_TO_LF)
+    if _DELIMITER_DB is not None:
+        questions = _split_with_hyperscan(text)
+    else:
+        questions = _split_on_starts(text, [m.start() for m in _QUESTION_START.finditer(text)])
+    return [q for q in questions if len(q) > 10][:limit]
+
+def _split_on_starts(text, starts):
+    # one linear sweep: slice the original string between consecutive delimiter offsets
+    cuts = [0] + starts + [len(text)]
+    pieces = (text[a:b].strip() for a, b in zip(cuts, cuts[1:]))
+    return [p for p in pieces if p]
+
+def iter_questions_from_pages(pages):
+    """
+    Incremental split_questions_from_text: a question is emitted as soon as the next
+    delimiter arrives; the trailing partial question is buffered until the next page.
+    """
+    buf = ""
+    for page in pages:
+        buf += "\n" + page.translate(_CR_TO_LF)
+        starts = [m.start() for m in _QUESTION_START.finditer(buf)]
+        if not starts:
+            continue
+        yield from (q for q in _split_on_starts(buf[:starts[-1]], starts[:-1]) if len(q) > 10)
+        buf = buf[starts[-1]:]
+    yield from (q for q in _split_on_starts(buf, []) if len(q) > 10)
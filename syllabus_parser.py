@@ -3,8 +3,16 @@ import re
 import json
 
 # Basic heuristics parser for common syllabus layouts. Good if syllabus is semi-structured.
-SUBJECT_HEADING_RE = re.compile(r"^\s*\(?([A-Z0-9/]+)\)?\s*[\-\:\)]?\s*(.+)$", re.IGNORECASE)
+# a code token of 4+ upper-case letters/digits (starting with 2 letters), a separator, then the title;
+# case-sensitive so ordinary sentences and bullets aren't taken for headings
+SUBJECT_HEADING_RE = re.compile(r"^\s*\(?([A-Z]{2,}[A-Z0-9/]{2,})\)?[\s\-:)]+(.{3,})$")
 YEAR_SEM_RE = re.compile(r"(\d+(?:st|nd|rd|th)\s+Year).{0,40}?(\d+(?:st|nd|rd|th)\s+Semester)?", re.IGNORECASE)
+# one alternation instead of scanning the keyword list per line; "course outcomes" and
+# "learning outcomes" are already covered by the shorter "course outcome" / "outcomes"
+CO_HEADER_RE = re.compile(r"course outcome|outcomes|course objective", re.IGNORECASE)
+CO_PREFIX_RE = re.compile(r'^(course outcomes?|learning outcomes?|course objectives?)[:\-\s]*', re.IGNORECASE)
+TOPIC_LEADER_RE = re.compile(r'^(Module|Unit|Chapter)\b', re.IGNORECASE)
+TOPIC_SPLIT_RE = re.compile(r'[\n•\u2022;•\-–]+')
 
 def validate_syllabus_json(obj):
     """
@@ -34,7 +42,7 @@ def validate_syllabus_json(obj):
 
 def split_topics(text):
     # split via bullets, semicolons, newlines
-    parts = re.split(r'[\n•\u2022;•\-–]+', text)
+    parts = TOPIC_SPLIT_RE.split(text)
     return [p.strip() for p in parts if p.strip()]
 
 def parse_syllabus_text(raw_text):
@@ -43,10 +51,9 @@ def parse_syllabus_text(raw_text):
     Returns list of subject dicts: subject, subject_code, year, semester, topics, course_outcomes, raw_text
     """
     lines = raw_text.splitlines()
-    headings_idx = []
-    for i, line in enumerate(lines):
-        if SUBJECT_HEADING_RE.match(line):
-            headings_idx.append(i)
+    # one pass: keep the heading match objects so blocks don't re-match their first line
+    headings = [(i, m) for i, m in enumerate(map(SUBJECT_HEADING_RE.match, lines)) if m]
+    headings_idx = [i for i, _ in headings]
     blocks = []
     if not headings_idx:
         # fallback: split paragraphs
@@ -70,16 +77,13 @@ def parse_syllabus_text(raw_text):
             })
         return blocks
 
-    for idx, start in enumerate(headings_idx):
+    for idx, (start, m) in enumerate(headings):
         end = headings_idx[idx+1] if idx+1 < len(headings_idx) else len(lines)
-        block = "\n".join(lines[start:end]).strip()
-        first_line = lines[start]
-        m = SUBJECT_HEADING_RE.match(first_line)
-        if m:
-            code, title = m.group(1), m.group(2)
-        else:
-            code, title = "", first_line
-        topics, cos = extract_topics_and_cos(block)
+        block_lines = lines[start:end]
+        block = "\n".join(block_lines).strip()
+        code, title = m.group(1), m.group(2)
+        # reuse the already-split lines instead of re-splitting the joined block
+        topics, cos = _topics_and_cos_from_lines([l.strip() for l in block_lines if l.strip()])
         blocks.append({
             "subject": title.strip(),
             "subject_code": code.strip(),
@@ -105,15 +109,17 @@ def extract_topics_and_cos(block_text):
     """
     Simple: find lines after keywords 'Topics','Syllabus','Course Outcomes' etc.
     """
-    lines = [l.strip() for l in block_text.splitlines() if l.strip()]
+    return _topics_and_cos_from_lines([l.strip() for l in block_text.splitlines() if l.strip()])
+
+def _topics_and_cos_from_lines(lines):
+    """extract_topics_and_cos over already stripped, non-empty lines."""
     topics = []
     cos = []
     co_mode = False
     for i, line in enumerate(lines[1:], start=1):
-        low = line.lower()
-        if any(k in low for k in ["course outcome", "course outcomes", "learning outcomes", "outcomes", "course objective"]):
+        if CO_HEADER_RE.search(line):
             co_mode = True
-            remainder = re.sub(r'^(course outcomes?|learning outcomes?|course objectives?)[:\-\s]*', '', line, flags=re.I)
+            remainder = CO_PREFIX_RE.sub('', line)
             if remainder.strip():
                 cos.append(remainder.strip())
             continue
@@ -122,15 +128,16 @@ def extract_topics_and_cos(block_text):
             cos.append(line)
         else:
             # if bullet-like or comma separated or "Module" or "Unit"
-            if line.startswith(("•","-","*")) or "," in line or ":" in line or re.match(r'^(Module|Unit|Chapter)\b', line, re.I):
+            if line.startswith(("•","-","*")) or "," in line or ":" in line or TOPIC_LEADER_RE.match(line):
                 topics.append(line)
             else:
                 # small lines likely topics
                 if len(line.split()) <= 12:
                     topics.append(line)
-    # cleanup
-    topics = [t.strip() for t in dict.fromkeys(topics) if t.strip()]
-    cos = [c.strip() for c in dict.fromkeys(cos) if c.strip()]
+    # cleanup: lines arrive stripped and non-empty (CO remainders are stripped above),
+    # so only the order-preserving dedup is left
+    topics = list(dict.fromkeys(topics))
+    cos = list(dict.fromkeys(cos))
     return topics, cos
 
 
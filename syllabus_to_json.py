@@ -1,28 +1,51 @@
 """
 syllabus_to_json.py
 Usage:
-    python syllabus_to_json.py /path/to/2.1.2_2019_Syllabus_CurriculumWise.docx.pdf output.json
+    python syllabus_to_json.py /path/to/2.1.2_2019_Syllabus_CurriculumWise.docx.pdf output.json [--raw]
+    python syllabus_to_json.py --batch "syllabi/*.pdf" out_dir/ [--raw]
 Produces structured JSON with keys:
   - year
   - semester
-  - subjects: [ { subject, subject_code, category(optional), credit(optional),
-                  topics: [...], course_outcomes: [...] , raw_text: "..." }, ... ]
+  - subjects: [ { subject, subject_code, year, semester, category(optional), credit(optional),
+                  topics: [...], course_outcomes: [...] , raw_text: "..." (only with --raw) }, ... ]
 """
 
+import os
 import sys
+import glob
+import bisect
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pdfplumber
 import re
 import json
 
+# PyMuPDF is optional — its text extraction is much faster than pdfplumber's pdfminer stack
+try:
+    import fitz
+except Exception:
+    fitz = None
+
+# orjson is optional — serializes (and indents) in native code
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # --- Helper regexes (tuned for the uploaded syllabus style) ---
 # Subject heading example: (IT/PC/B/T/211) Data Structures and Algorithms
+# MULTILINE so the whole document is scanned in one finditer. The title may follow on the
+# next non-empty line: PyMuPDF often emits "(IT/BS/B/T/212)" and its title as separate lines
 SUBJECT_HEADING_RE = re.compile(
-    r"^\s*\((?P<code>[A-Z0-9/]+)\)\s*(?P<title>[^(\n\r]+)",
-    flags=re.IGNORECASE
+    r"^[^\S\r\n]*\((?P<code>[A-Z0-9/]+)\)\s*(?P<title>[^(\n\r]+)",
+    flags=re.IGNORECASE | re.MULTILINE
 )
 
-# Year / Semester heading examples: "2nd Year 1st Semester" or "4th Year 2nd Semester"
-YEAR_SEM_RE = re.compile(r"(?P<year>\d+(?:st|nd|rd|th)\s+Year)\s+(?P<semester>\d+(?:st|nd|rd|th)\s+Semester)", re.IGNORECASE)
+# Year / Semester heading examples: "2nd Year 1st Semester" or "4th Year 2nd Semester".
+# pdfplumber sometimes drops the space after the ordinal ("3rdYear 1stSemester")
+YEAR_SEM_RE = re.compile(r"(?P<year>\d+(?:st|nd|rd|th)\s*Year)\s*(?P<semester>\d+(?:st|nd|rd|th)\s*Semester)", re.IGNORECASE)
+ORDINAL_RE = re.compile(r"(\d+(?:st|nd|rd|th))\s*", re.IGNORECASE)
 
 # Course outcomes block heading (if worded explicitly)
 CO_OUTCOME_HEADERS = [
@@ -38,35 +61,65 @@ CO_OUTCOME_RE = re.compile(r"(?:" + r"|".join(CO_OUTCOME_HEADERS) + r")[:\s-]*",
 # Topic / Section heuristics: lines that are bullets or look like "Introduction:", "Module-1", or "Topics:"
 TOPIC_LEADERS = (r"introduction", r"module", r"topics?", r"chapter", r"contents?", r"syllabus", r"unit")
 
+# per-line / per-block patterns, compiled once instead of looked up in re's cache on every call
+# one alternation per line instead of a regex per heuristic, tried in the loop's old order:
+# module/unit line, "<leader>...:" topic heading (text before the first colon starts with a
+# leader), bullet (group = text after the bullet)
+LINE_SCAN_RE = re.compile(
+    r"^(?:(?P<mod>(?:Module|Unit|Chapter)\b)"
+    r"|(?P<kv>(?:" + r"|".join(TOPIC_LEADERS) + r")[^:]*:)"
+    r"|[\u2022\-\*\•\–\—]\s*(?P<bullet>.+))",
+    re.IGNORECASE
+)
+CO_SPLIT_RE = re.compile(r"[;\n•\-–]+")
+PARA_SPLIT_RE = re.compile(r"\n\s*\n")
+SEMESTER_RE = re.compile(r"(\d+(?:st|nd|rd|th)\s*Semester)", re.IGNORECASE)
+YEAR_RE = re.compile(r"(\d+(?:st|nd|rd|th)\s*Year)", re.IGNORECASE)
+
 # -----------------------------------------------------------------------------
-def extract_text_from_pdf(path):
+def _pdf_pages_fitz(path):
+    # single process: a whole syllabus extracts in well under a second, less than a pool costs to start
+    with fitz.open(path) as doc:
+        # plain "text" mode: everything downstream is line-oriented
+        return [page.get_text("text") for page in doc]
+
+def _pdf_pages_pdfplumber(path):
     pages = []
     with pdfplumber.open(path) as pdf:
         for p in pdf.pages:
             txt = p.extract_text() or ""
             pages.append(txt)
+    return pages
+
+def extract_text_from_pdf(path):
+    st = os.stat(path)
+    return _extract_text_cached(path, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=32)
+def _extract_text_cached(path, mtime_ns, size):
+    # stat fields are part of the key so a rewritten file is re-extracted
+    pages = None
+    if fitz:
+        try:
+            pages = _pdf_pages_fitz(path)
+        except Exception:
+            pages = None  # file PyMuPDF can't handle — fall back to pdfplumber
+    if pages is None:
+        pages = _pdf_pages_pdfplumber(path)
     full = "\n".join(pages)
     # normalize whitespace
-    return re.sub(r"\r", "\n", full)
+    return full.replace("\r", "\n")
 
 def split_into_subject_blocks(text):
     """
     Find all subject headings and split the document into blocks per subject.
     Returns list of tuples: (heading_match, block_text)
     """
-    lines = text.splitlines()
-    headings = []
-    for i, line in enumerate(lines):
-        m = SUBJECT_HEADING_RE.match(line)
-        if m:
-            headings.append((i, m))
-    blocks = []
-    for idx, (i, m) in enumerate(headings):
-        start = i
-        end = headings[idx+1][0] if idx+1 < len(headings) else len(lines)
-        block_text = "\n".join(lines[start:end]).strip()
-        blocks.append((m, block_text))
-    return blocks
+    # the regex engine skips straight between headings; each block runs from its heading's
+    # line start to the next one's
+    headings = list(SUBJECT_HEADING_RE.finditer(text))
+    ends = [m.start() for m in headings[1:]] + [len(text)]
+    return [(m, text[m.start():end].strip()) for m, end in zip(headings, ends)]
 
 def extract_topics_and_outcomes(block_text):
     """
@@ -75,8 +128,16 @@ def extract_topics_and_outcomes(block_text):
       - Modules: detect "Module-1", "Module 1", "Unit 1" and collect following paragraphs until next module or blank line
       - Course outcomes: try to find an explicit heading; otherwise leave empty list
     """
-    topics = []
+    # candidates arrive stripped; filter and dedupe as they're found instead of afterwards
+    topics, seen = [], set()
     outcomes = []
+    scan = [block_text]
+
+    def add_topic(t):
+        if len(t) > 1 and t not in seen:
+            seen.add(t)
+            topics.append(t)
+
     # Try to find an explicit Course Outcomes section
     co_match = CO_OUTCOME_RE.search(block_text)
     if co_match:
@@ -84,97 +145,139 @@ def extract_topics_and_outcomes(block_text):
         start = co_match.start()
         tail = block_text[start:]
         # split at two newlines or next capitalized heading line
-        parts = re.split(r"\n\s*\n", tail, maxsplit=1)
+        parts = PARA_SPLIT_RE.split(tail, maxsplit=1)
         co_text = parts[0]
+        # the CO section's lines are outcomes, not topics: scan around them below
+        co_line_start = block_text.rfind("\n", 0, start) + 1
+        scan = [block_text[:co_line_start], block_text[start + len(co_text):]]
         # clean heading
         co_text = CO_OUTCOME_RE.sub("", co_text).strip()
         # split on semicolons or sentences
-        outcomes = [s.strip() for s in re.split(r"[;\n•\-–•]+", co_text) if s.strip()]
+        stripped = (s.strip() for s in CO_SPLIT_RE.split(co_text))
+        outcomes = list(dict.fromkeys(s for s in stripped if len(s) > 1))
     # Extract modules/topics
     # Find lines with Module- or Unit- or lines that look like "Introduction: ..."
-    for line in block_text.splitlines():
+    for line in (line for part in scan for line in part.splitlines()):
         line_strip = line.strip()
         if not line_strip:
             continue
-        # module/unit
-        if re.match(r"^(Module|MODULE|Unit|UNIT|Chapter|CHAPTER)\b", line_strip):
-            topics.append(line_strip)
-            continue
-        # colon-based topic headings
-        if ":" in line_strip:
-            # often "Introduction: ...", "Topics:" etc.
-            left = line_strip.split(":", 1)[0]
-            if any(left.lower().startswith(tl) for tl in TOPIC_LEADERS):
-                # keep whole line for context
-                topics.append(line_strip)
-                continue
-        # bullets / short lines (<100 chars) with capitalized start could be topics
-        if re.match(r"^[\u2022\-\*\•\–\—]\s*(.+)", line_strip):
-            cleaned = re.sub(r"^[\u2022\-\*\•\–\—]\s*", "", line_strip)
-            topics.append(cleaned)
+        # module/unit, colon-based topic headings ("Introduction: ...", "Topics:") and bullets
+        m = LINE_SCAN_RE.match(line_strip)
+        if m:
+            # headings keep the whole line for context; line_strip has no trailing space, so
+            # the bullet group is exactly the text after the bullet
+            add_topic(m.group("bullet") if m.lastgroup == "bullet" else line_strip)
             continue
         # sometimes topics are lines with many commas and lower length
         if len(line_strip) < 200 and ("," in line_strip or len(line_strip.split())<=12) and line_strip[0].isalpha():
             # naive check for topic-like line (skip long paragraphs)
             # exclude the initial heading line (which often contains code/title)
-            topics.append(line_strip)
-    # dedupe and clean
-    topics = [t.strip() for t in dict.fromkeys(topics) if len(t.strip())>1]
-    outcomes = [o.strip() for o in dict.fromkeys(outcomes) if len(o.strip())>1]
+            add_topic(line_strip)
     return topics, outcomes
 
-def parse_subject_block(match, block_text):
+def parse_subject_block(match, block_text, include_raw_text=False):
     code = match.group("code").strip()
-    title = match.group("title").strip()
+    # layout-dependent runs of spaces ("Automata and  Compiler") collapse to one
+    title = " ".join(match.group("title").split())
     # attempt to pull category / credits if present in same line
     extra = ""
     # topics / outcomes
     topics, outcomes = extract_topics_and_outcomes(block_text)
-    return {
+    subj = {
         "subject": title,
         "subject_code": code,
-        "raw_text": block_text,
         "topics": topics,
         "course_outcomes": outcomes
     }
+    if include_raw_text:
+        # a second copy of the whole document otherwise — opt-in
+        subj["raw_text"] = block_text
+    return subj
+
+def _label(s):
+    # "3rdYear" / "3rd  Year" -> "3rd Year"
+    return ORDINAL_RE.sub(r"\1 ", s.strip())
 
 def extract_year_semester(text):
     m = YEAR_SEM_RE.search(text)
     if m:
-        return m.group("year").strip(), m.group("semester").strip()
+        return _label(m.group("year")), _label(m.group("semester"))
     # fallback: search for "1st Semester", "2nd Semester" etc anywhere
-    sem_m = re.search(r"(\d+(?:st|nd|rd|th)\s+Semester)", text, re.IGNORECASE)
-    yr_m = re.search(r"(\d+(?:st|nd|rd|th)\s+Year)", text, re.IGNORECASE)
-    yr = yr_m.group(1).strip() if yr_m else ""
-    sem = sem_m.group(1).strip() if sem_m else ""
+    sem_m = SEMESTER_RE.search(text)
+    yr_m = YEAR_RE.search(text)
+    yr = _label(yr_m.group(1)) if yr_m else ""
+    sem = _label(sem_m.group(1)) if sem_m else ""
     return yr, sem
 
-def main(pdf_path, out_json_path):
-    print("Reading PDF...")
+def year_semester_headings(text):
+    """Offsets and labels of every "<n> Year <m> Semester" heading, in document order."""
+    return [(m.start(), _label(m.group("year")), _label(m.group("semester")))
+            for m in YEAR_SEM_RE.finditer(text)]
+
+def year_semester_at(headings, pos, default=("", "")):
+    """(year, semester) of the last heading before offset pos, else default."""
+    i = bisect.bisect_right([h[0] for h in headings], pos)
+    return headings[i - 1][1:] if i else default
+
+def write_json(result, out_json_path):
+    if orjson:
+        # UTF-8 without escaping, like ensure_ascii=False
+        with open(out_json_path, "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        return
+    # same bytes as the orjson branch: two-space indent, no trailing newline, \n line endings
+    with open(out_json_path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+def build_result(pdf_path, include_raw_text=False):
     text = extract_text_from_pdf(pdf_path)
     year, semester = extract_year_semester(text)
     blocks = split_into_subject_blocks(text)
+    headings = year_semester_headings(text)
     subjects = []
     for match, block_text in blocks:
-        subj = parse_subject_block(match, block_text)
+        subj = parse_subject_block(match, block_text, include_raw_text)
+        # each subject belongs to the semester heading it appears under
+        subj["year"], subj["semester"] = year_semester_at(headings, match.start(), (year, semester))
         subjects.append(subj)
-    result = {
+    return {
         "filename": pdf_path,
         "year": year,
         "semester": semester,
         "subjects": subjects
     }
-    with open(out_json_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-    print(f"Done. Wrote {len(subjects)} subject blocks to {out_json_path}")
+
+def main(pdf_path, out_json_path, include_raw_text=False):
+    print("Reading PDF...")
+    result = build_result(pdf_path, include_raw_text)
+    write_json(result, out_json_path)
+    print(f"Done. Wrote {len(result['subjects'])} subject blocks to {out_json_path}")
+
+def batch_main(pdf_glob, out_dir, include_raw_text=False):
+    """
+    Convert every PDF matching pdf_glob into out_dir/<name>.json. One pool of worker
+    processes is shared by the whole batch, each converting one PDF at a time.
+    """
+    paths = sorted(glob.glob(pdf_glob))
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor() as ex:
+        for path, result in zip(paths, ex.map(build_result, paths, repeat(include_raw_text))):
+            out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".json")
+            write_json(result, out_path)
+            print(f"{path}: {len(result['subjects'])} subject blocks -> {out_path}")
+    print(f"Done. Converted {len(paths)} PDFs into {out_dir}")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python syllabus_to_json.py input.pdf output.json")
+    args = [a for a in sys.argv[1:] if a not in ("--raw", "--batch")]
+    if len(args) < 2:
+        print("Usage: python syllabus_to_json.py input.pdf output.json [--raw]")
+        print("       python syllabus_to_json.py --batch \"glob/*.pdf\" out_dir [--raw]")
         sys.exit(1)
-    pdf_path = sys.argv[1]
-    out_path = sys.argv[2]
-    main(pdf_path, out_path)
+    include_raw = "--raw" in sys.argv[1:]
+    if "--batch" in sys.argv[1:]:
+        batch_main(args[0], args[1], include_raw_text=include_raw)
+    else:
+        main(args[0], args[1], include_raw_text=include_raw)
 
 
 
@@ -0,0 +1,15 @@
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# OCR and Gemini caches of anything the tests run go to a throwaway directory, never the repo
+_CACHE_ROOT = tempfile.mkdtemp(prefix="qbank-tests-")
+os.environ["GEMINI_CACHE_DIR"] = os.path.join(_CACHE_ROOT, "gemini")
+os.environ["OCR_CACHE_DIR"] = os.path.join(_CACHE_ROOT, "ocr")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_CACHE_ROOT, ignore_errors=True)
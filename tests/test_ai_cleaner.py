@@ -0,0 +1,52 @@
+import types
+
+import pytest
+
+ai_cleaner = pytest.importorskip("ai_cleaner")
+
+CHUNK = "Th1s is OCR text wiht typos. " * 10
+
+
+def _fake_generate(outputs, calls):
+    async def generate(model_name, prompt, max_output_tokens):
+        calls.append((model_name, max_output_tokens))
+        out = outputs[model_name]
+        if isinstance(out, Exception):
+            raise out
+        return out
+    return generate
+
+
+def test_flash_error_falls_back_to_pro(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_cleaner, "_generate_clean_text", _fake_generate(
+        {ai_cleaner.CLEAN_MODEL_NAME: RuntimeError("quota"), ai_cleaner.CLEAN_FALLBACK_MODEL_NAME: CHUNK.strip()},
+        calls))
+    assert ai_cleaner.clean_text_with_ai(CHUNK) == CHUNK.strip()
+    assert [m for m, _ in calls] == [ai_cleaner.CLEAN_MODEL_NAME, ai_cleaner.CLEAN_FALLBACK_MODEL_NAME]
+
+
+def test_short_flash_output_kept_when_pro_fails(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_cleaner, "_generate_clean_text", _fake_generate(
+        {ai_cleaner.CLEAN_MODEL_NAME: "short", ai_cleaner.CLEAN_FALLBACK_MODEL_NAME: RuntimeError("down")},
+        calls))
+    assert ai_cleaner.clean_text_with_ai(CHUNK) == "short"
+
+
+def test_output_budget_covers_the_input_and_thinking():
+    chunk = "x" * ai_cleaner.MAX_CHUNK_CHARS
+    assert ai_cleaner._output_budget(chunk) > ai_cleaner.THINKING_TOKEN_BUDGET + len(chunk) // ai_cleaner.CHARS_PER_TOKEN
+
+
+def test_truncated_response_raises(monkeypatch):
+    candidate = types.SimpleNamespace(finish_reason=types.SimpleNamespace(name="MAX_TOKENS"))
+    response = types.SimpleNamespace(candidates=[candidate], text="half a pa")
+
+    class Model:
+        async def generate_content_async(self, prompt, generation_config=None):
+            return response
+
+    monkeypatch.setattr(ai_cleaner, "_get_model", lambda name: Model())
+    with pytest.raises(RuntimeError, match="MAX_TOKENS"):
+        ai_cleaner.run_async(ai_cleaner._generate_clean_text.__wrapped__("m", "p", 100))
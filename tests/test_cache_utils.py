@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+import cache_utils
+from cache_utils import content_key, disk_cache
+
+
+def test_content_key_is_stable_and_separates_parts():
+    assert content_key("a", 1) == content_key("a", 1)
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key(b"x") == content_key("x")
+
+
+def test_keyed_on_positional_args_only(tmp_path):
+    calls = []
+
+    @disk_cache(str(tmp_path))
+    def f(a, b, extra=None):
+        calls.append((a, b, extra))
+        return f"{a}{b}{extra}"
+
+    assert f("x", 1, extra="first") == "x1first"
+    # kwargs are passed through but not hashed: the first result is served
+    assert f("x", 1, extra="second") == "x1first"
+    assert f("x", 2) == "x2None"
+    assert calls == [("x", 1, "first"), ("x", 2, None)]
+
+
+@pytest.mark.skipif(cache_utils.diskcache is None, reason="in-memory fallback is per decorator")
+def test_entries_survive_a_new_decorator_on_the_same_directory(tmp_path):
+    disk_cache(str(tmp_path))(lambda a: a.upper())("abc")
+
+    @disk_cache(str(tmp_path))
+    def other(a):
+        raise AssertionError("should be served from disk")
+
+    # the key is the arguments alone, so any function cached in this directory shares it
+    assert other("abc") == "ABC"
+
+
+def test_exceptions_are_not_cached(tmp_path):
+    attempts = []
+
+    @disk_cache(str(tmp_path))
+    def flaky(a):
+        attempts.append(a)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return a
+
+    with pytest.raises(RuntimeError):
+        flaky("q")
+    assert flaky("q") == "q"
+    assert attempts == ["q", "q"]
+
+
+def test_async_functions(tmp_path):
+    calls = []
+
+    @disk_cache(str(tmp_path))
+    async def g(a):
+        calls.append(a)
+        return a * 2
+
+    assert asyncio.run(g(3)) == 6
+    assert asyncio.run(g(3)) == 6
+    assert calls == [3]
+
+
+def test_store_is_opened_on_first_call(tmp_path):
+    directory = tmp_path / "lazy"
+
+    @disk_cache(str(directory))
+    def h(a):
+        return a
+
+    assert not directory.exists()
+    assert h("x") == "x"
+    assert h.get_cache().get(content_key("x")) == "x"
+    if cache_utils.diskcache is not None:
+        assert directory.exists()
+
+
+def test_importing_cached_modules_creates_no_cache_dirs(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {k: v for k, v in os.environ.items() if k not in ("GEMINI_CACHE_DIR", "OCR_CACHE_DIR")}
+    env["PYTHONPATH"] = root
+    # a fresh interpreter in an empty directory: the default ./.gemini_cache / ./.ocr_cache apply
+    code = ("import importlib\n"
+            "for name in ('cache_utils', 'ocr_utils', 'gemini_handler', 'ai_cleaner'):\n"
+            "    try:\n"
+            "        importlib.import_module(name)\n"
+            "    except ImportError:\n"
+            "        pass\n")
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True, capture_output=True)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,116 @@
+import asyncio
+import types
+
+import pytest
+
+gemini_handler = pytest.importorskip("gemini_handler")
+
+
+def _response(text, finish="STOP"):
+    candidate = types.SimpleNamespace(finish_reason=types.SimpleNamespace(name=finish))
+    return types.SimpleNamespace(text=text, candidates=[candidate])
+
+
+class _FakeModel:
+    def __init__(self, text, finish="STOP"):
+        self.text, self.finish, self.calls = text, finish, []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls.append((prompt, generation_config))
+        return _response(self.text, self.finish)
+
+
+def test_generate_text_uses_generate_content(monkeypatch):
+    model = _FakeModel('{"subject_name": "DSA"}')
+    names = []
+    monkeypatch.setattr(gemini_handler, "_get_model", lambda name: names.append(name) or model)
+    # undecorated function: the on-disk cache is neither read nor written
+    raw = gemini_handler._generate_text.__wrapped__("gemini-test", "prompt text")
+    assert raw == '{"subject_name": "DSA"}'
+    assert names == ["gemini-test"]
+    assert model.calls == [("prompt text", {"max_output_tokens": gemini_handler._output_budget(),
+                                            "temperature": 0.0})]
+
+
+def test_output_budget_leaves_room_for_thinking():
+    assert gemini_handler._output_budget() == gemini_handler.MAX_OUTPUT_TOKENS + gemini_handler.THINKING_TOKEN_BUDGET
+    assert gemini_handler._output_budget(10) == 10 * gemini_handler.MAX_OUTPUT_TOKENS + gemini_handler.THINKING_TOKEN_BUDGET
+
+
+def test_generate_text_raises_on_truncated_answer(monkeypatch):
+    monkeypatch.setattr(gemini_handler, "_get_model", lambda name: _FakeModel('{"subject_na', "MAX_TOKENS"))
+    with pytest.raises(RuntimeError, match="MAX_TOKENS"):
+        gemini_handler._generate_text.__wrapped__("gemini-test", "prompt text")
+
+
+@pytest.mark.parametrize("raw", [
+    '{"subject_name": "DSA", "confidence_score": 0.9}',
+    '```json\n{"subject_name": "DSA", "confidence_score": 0.9}\n```',
+    'Here you go {not json} and then {"subject_name": "DSA", "confidence_score": 0.9} done.',
+])
+def test_parse_gemini_output_finds_the_object(raw):
+    parsed, kept = gemini_handler._parse_gemini_output(raw)
+    assert parsed == {"subject_name": "DSA", "confidence_score": 0.9}
+    assert kept == raw.strip()
+
+
+def test_parse_gemini_output_handles_braces_inside_strings():
+    parsed, _ = gemini_handler._parse_gemini_output('note: {"question_text": "Evaluate {x | x > 0}"}')
+    assert parsed == {"question_text": "Evaluate {x | x > 0}"}
+
+
+@pytest.mark.parametrize("raw", ["no json here", '{"unterminated": ', ""])
+def test_parse_gemini_output_raises_without_json(raw):
+    with pytest.raises(ValueError):
+        gemini_handler._parse_gemini_output(raw)
+
+
+@pytest.mark.parametrize("raw", [
+    '[{"a": 1}, {"b": 2}]',
+    'Sure [see below]\n[{"a": 1}, {"b": 2}]',
+    '```json\n[{"a": 1}, {"b": 2}]\n```',
+    'Scores [1, 2] first, then [{"a": 1}, {"b": 2}]',
+])
+def test_parse_gemini_array_skips_leading_brackets(raw):
+    parsed, _ = gemini_handler._parse_gemini_array(raw, 2)
+    assert parsed == [{"a": 1}, {"b": 2}]
+
+
+@pytest.mark.parametrize("raw", ['[{"a": 1}]', "[see below]", '{"a": 1}'])
+def test_parse_gemini_array_rejects_wrong_shape(raw):
+    with pytest.raises(ValueError):
+        gemini_handler._parse_gemini_array(raw, 2)
+
+
+def test_generate_text_raises_on_empty_answer(monkeypatch):
+    monkeypatch.setattr(gemini_handler, "_get_model", lambda name: _FakeModel("  "))
+    with pytest.raises(RuntimeError, match="no text"):
+        gemini_handler._generate_text.__wrapped__("gemini-test", "prompt text")
+
+
+class _FakeAsyncModel(_FakeModel):
+    async def generate_content_async(self, prompt, generation_config=None, **kwargs):
+        self.calls.append((prompt, generation_config, kwargs))
+        return _response(self.text, self.finish)
+
+
+def test_generate_text_async_reads_the_whole_response(monkeypatch):
+    model = _FakeAsyncModel('```json\n[{"a": 1}]\n```')
+    monkeypatch.setattr(gemini_handler, "_get_model", lambda name: model)
+    raw = asyncio.run(gemini_handler._generate_text_async.__wrapped__("gemini-test", "p", max_output_tokens=99))
+    assert raw == '```json\n[{"a": 1}]\n```'
+    assert model.calls == [("p", {"max_output_tokens": 99, "temperature": 0.0}, {})]
+
+
+@pytest.mark.parametrize("text,finish", [('[{"a": 1}', "MAX_TOKENS"), ("", "SAFETY"), ("", "STOP")])
+def test_generate_text_async_raises_on_incomplete_answer(monkeypatch, text, finish):
+    monkeypatch.setattr(gemini_handler, "_get_model", lambda name: _FakeAsyncModel(text, finish))
+    with pytest.raises(RuntimeError):
+        asyncio.run(gemini_handler._generate_text_async.__wrapped__("gemini-test", "p"))
+
+
+def test_shared_context_leaves_output_shape_to_the_per_call_template():
+    context = gemini_handler.CONTEXT_TEMPLATE.lower()
+    assert "single question" not in context and "array" not in context
+    assert "single json object" in gemini_handler.QUESTION_TEMPLATE.lower()
+    assert "json array" in gemini_handler.GROUP_QUESTION_TEMPLATE.lower()
@@ -0,0 +1,27 @@
+import asyncio
+import threading
+
+import pytest
+
+import loop_utils
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_every_thread_runs_on_the_same_loop():
+    loops = [loop_utils.run_async(_current_loop())]
+    t = threading.Thread(target=lambda: loops.append(loop_utils.run_async(_current_loop())))
+    t.start()
+    t.join()
+    assert len(loops) == 2 and loops[0] is loops[1]
+    assert loops[0].is_running() and not loops[0].is_closed()
+
+
+def test_run_async_refuses_to_block_the_shared_loop():
+    async def nested():
+        loop_utils.run_async(_current_loop())
+
+    with pytest.raises(RuntimeError):
+        loop_utils.run_async(nested())
@@ -0,0 +1,139 @@
+import os
+
+import pytest
+
+ocr_utils = pytest.importorskip("ocr_utils")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample(name):
+    path = os.path.join(ROOT, name)
+    if not os.path.exists(path):
+        pytest.skip(f"{name} missing")
+    return path
+
+
+@pytest.mark.parametrize("name,pages", [("NS_CT2_2024.pdf", 1), ("question2.pdf", 3)])
+def test_scans_with_hidden_text_layer_are_image_only(name, pages):
+    pytest.importorskip("pypdf")
+    layer = ocr_utils.pdf_text_layer(_sample(name), 10)
+    assert layer == [""] * pages
+
+
+def test_machine_text_pdf_keeps_its_text_layer():
+    pytest.importorskip("pypdf")
+    layer = ocr_utils.pdf_text_layer(_sample("2.1.2_2019_Syllabus_CurriculumWise.docx.pdf"), 3)
+    assert len(layer) == 3
+    assert all(len(t.strip()) >= ocr_utils.TEXT_LAYER_MIN_CHARS for t in layer)
+
+
+def test_downscale_keeps_requested_dpi():
+    from PIL import Image
+
+    a4_at_300 = Image.new("L", (2480, 3508))
+    img, dpi = ocr_utils._downscale(a4_at_300, 300)
+    assert img.size == (2480, 3508) and dpi == 300
+
+
+def test_downscale_caps_images_without_dpi():
+    from PIL import Image
+
+    img, dpi = ocr_utils._downscale(Image.new("L", (4000, 3000)))
+    assert max(img.size) == ocr_utils.OCR_MAX_SIDE and dpi is None
+
+
+def test_fitz_document_is_reused_then_closed():
+    pytest.importorskip("fitz")
+    path = _sample("question2.pdf")
+    doc = ocr_utils._open_fitz(path)
+    assert ocr_utils._open_fitz(path) is doc
+    ocr_utils.render_pdf_page(path, 1, 50)
+    ocr_utils._close_fitz()
+    assert doc.is_closed
+    assert ocr_utils._fitz_local.doc is None
+
+
+def test_page_ocr_cache_key_includes_the_engine(monkeypatch):
+    from PIL import Image
+
+    keys = []
+
+    def fake_cached(digest, shape, lang, config, backend, processed=None, dpi=None):
+        keys.append(backend)
+        return ""
+
+    monkeypatch.setattr(ocr_utils, "_tesseract_cached", fake_cached)
+    for engine in (None, object()):
+        monkeypatch.setattr(ocr_utils, "tesserocr", engine)
+        ocr_utils._ocr_pil_image(Image.new("L", (64, 64), 255), dpi=200)
+    assert keys[0].startswith("tesseract:") and keys[1].startswith("tesserocr:")
+
+
+def test_ocr_pool_spawns_workers(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_PROCESSES", 2)
+    monkeypatch.setattr(ocr_utils.pytesseract.pytesseract, "tesseract_cmd", "/opt/test/tesseract")
+    with ocr_utils._ocr_pool(2) as pool:
+        assert pool._ctx.get_start_method() == "spawn"
+        # the initializer carries the Tesseract path into the fresh interpreter
+        assert pool.apply(_worker_tesseract_cmd) == "/opt/test/tesseract"
+
+
+def _worker_tesseract_cmd():
+    return ocr_utils.pytesseract.pytesseract.tesseract_cmd
+
+
+def _worker_omp_thread_limit():
+    import os
+    return os.environ.get("OMP_THREAD_LIMIT")
+
+
+def test_ocr_pool_workers_start_with_the_omp_limit(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_PROCESSES", 2)
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    with ocr_utils._ocr_pool(2) as pool:
+        assert pool.apply(_worker_omp_thread_limit) == ocr_utils.OCR_WORKER_OMP_THREADS
+    # the parent's own environment is left as it was
+    assert _worker_omp_thread_limit() is None
+
+
+def test_ocr_pool_keeps_an_explicit_omp_limit(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_PROCESSES", 2)
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "3")
+    with ocr_utils._ocr_pool(2) as pool:
+        assert pool.apply(_worker_omp_thread_limit) == "3"
+
+
+def test_vlm_failure_uses_the_fallback_per_page(monkeypatch):
+    from PIL import Image
+
+    def broken_vlm():
+        raise RuntimeError("no GPU")
+
+    monkeypatch.setattr(ocr_utils, "_get_vlm", broken_vlm)
+    monkeypatch.setattr(ocr_utils, "SamplingParams", lambda **kw: None)
+    monkeypatch.setattr(ocr_utils, "_ocr_pil_image", lambda *a, **kw: pytest.fail("thumbnail was OCR'd"))
+    images = [Image.new("L", (1700, 2200)) for _ in range(2)]
+    texts = ocr_utils._vlm_ocr_images(images, fallback=lambda i: f"page {i}")
+    assert texts == ["page 0", "page 1"]
+
+
+def test_vlm_fallback_pages_are_rerendered_at_the_ocr_dpi(monkeypatch):
+    from PIL import Image
+
+    def broken_vlm():
+        raise RuntimeError("no GPU")
+
+    rendered = []
+    monkeypatch.setattr(ocr_utils, "pdfinfo_from_path", lambda path: {"Pages": 3})
+    monkeypatch.setattr(ocr_utils, "pdf_text_layer", lambda path, n: ["", "x" * 500, ""])
+    monkeypatch.setattr(ocr_utils, "vlm_available", lambda: True)
+    monkeypatch.setattr(ocr_utils, "convert_from_path",
+                        lambda path, dpi, first_page, last_page, thread_count:
+                        [Image.new("L", (100, 130)) for _ in range(first_page, last_page + 1)])
+    monkeypatch.setattr(ocr_utils, "_get_vlm", broken_vlm)
+    monkeypatch.setattr(ocr_utils, "SamplingParams", lambda **kw: None)
+    monkeypatch.setattr(ocr_utils, "_raster_and_ocr_page", lambda args: rendered.append(args) or f"p{args[1]}")
+    pages = list(ocr_utils.iter_pdf_pages("paper.pdf", dpi=300))
+    assert pages == [("p1", True), ("x" * 500, False), ("p3", True)]
+    assert rendered == [("paper.pdf", 1, 300, "eng"), ("paper.pdf", 3, 300, "eng")]
@@ -0,0 +1,36 @@
+from question_splitter import iter_questions_from_pages, split_questions_from_text
+
+PAPER = ("Answer all questions.\n1. Define a stack and give an example.\n"
+         "2) Explain process scheduling in detail.\nQ. 3 Compare paging and segmentation.\n")
+
+
+def test_split_on_every_delimiter_style():
+    assert split_questions_from_text(PAPER, 10) == [
+        "Answer all questions.",
+        "1. Define a stack and give an example.",
+        "2) Explain process scheduling in detail.",
+        "Q. 3 Compare paging and segmentation.",
+    ]
+
+
+def test_split_limit_short_pieces_and_blank_input():
+    assert split_questions_from_text(PAPER, 2) == ["Answer all questions.", "1. Define a stack and give an example."]
+    assert split_questions_from_text("1. short\n2. tiny", 10) == []
+    assert split_questions_from_text("   ", 10) == []
+    assert split_questions_from_text("", 10) == []
+
+
+def test_split_treats_carriage_returns_as_newlines():
+    assert split_questions_from_text(PAPER.replace("\n", "\r"), 10) == split_questions_from_text(PAPER, 10)
+
+
+def test_pages_match_whole_text():
+    pages = [PAPER[:40], PAPER[40:90], PAPER[90:]]
+    assert list(iter_questions_from_pages(pages)) == split_questions_from_text("\n".join(pages), 10)
+
+
+def test_question_spanning_pages_is_held_until_complete():
+    pages = iter(["1. Define a stack and", "give an example.\n2) Explain process scheduling."])
+    out = iter_questions_from_pages(pages)
+    assert next(out) == "1. Define a stack and\ngive an example."
+    assert list(out) == ["2) Explain process scheduling."]
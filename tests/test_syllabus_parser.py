@@ -0,0 +1,28 @@
+import pytest
+
+from syllabus_parser import SUBJECT_HEADING_RE, parse_syllabus_text
+
+
+@pytest.mark.parametrize("line,code,title", [
+    ("(IT/PC/B/T/211) Data Structures and Algorithms", "IT/PC/B/T/211", "Data Structures and Algorithms"),
+    ("CS101 - Algorithms", "CS101", "Algorithms"),
+    ("IT/PC/B/T/211: Operating Systems", "IT/PC/B/T/211", "Operating Systems"),
+])
+def test_subject_heading_matches(line, code, title):
+    m = SUBJECT_HEADING_RE.match(line)
+    assert m and m.groups() == (code, title)
+
+
+@pytest.mark.parametrize("line", ["Module 1: Introduction", "The course covers sorting.", "AB cd"])
+def test_subject_heading_ignores_body_lines(line):
+    assert SUBJECT_HEADING_RE.match(line) is None
+
+
+def test_parse_syllabus_text_splits_on_headings():
+    text = ("(IT/PC/B/T/211) Data Structures\nModule 1: Arrays; Linked lists\n"
+            "Course Outcomes: CO1 understand lists\n(IT/PC/B/T/212) Operating Systems\nUnit 1: Processes\n")
+    subjects = parse_syllabus_text(text)
+    assert [(s["subject_code"], s["subject"]) for s in subjects] == [
+        ("IT/PC/B/T/211", "Data Structures"), ("IT/PC/B/T/212", "Operating Systems")]
+    assert subjects[0]["course_outcomes"] == ["CO1 understand lists"]
+    assert subjects[1]["topics"] == ["Unit 1: Processes"]
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+import syllabus_to_json as s2j
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PDF = os.path.join(ROOT, "2.1.2_2019_Syllabus_CurriculumWise.docx.pdf")
+
+
+def test_heading_title_on_next_line():
+    text = "(IT/BS/B/T/212)\n\nProbability and Statistics\nModule 1\n(IT/PC/B/T/213) Computer Organisation\n"
+    found = [(m.group("code"), m.group("title").strip()) for m in s2j.SUBJECT_HEADING_RE.finditer(text)]
+    assert found == [("IT/BS/B/T/212", "Probability and Statistics"),
+                     ("IT/PC/B/T/213", "Computer Organisation")]
+
+
+def test_year_semester_labels_tolerate_missing_space():
+    assert s2j.extract_year_semester("3rdYear 1stSemester") == ("3rd Year", "1st Semester")
+    headings = s2j.year_semester_headings("2nd Year 1st Semester\n...\n2nd Year 2ndSemester\n")
+    assert s2j.year_semester_at(headings, 5) == ("2nd Year", "1st Semester")
+    assert s2j.year_semester_at(headings, 40) == ("2nd Year", "2nd Semester")
+    assert s2j.year_semester_at(headings, -1, ("x", "y")) == ("x", "y")
+
+
+@pytest.mark.skipif(not os.path.exists(SAMPLE_PDF), reason="sample syllabus PDF missing")
+@pytest.mark.parametrize("extractor", ["fitz", "pdfplumber"])
+def test_sample_syllabus_subjects(monkeypatch, extractor):
+    if extractor == "fitz":
+        pytest.importorskip("fitz")
+    else:
+        pytest.importorskip("pdfplumber")
+        monkeypatch.setattr(s2j, "fitz", None)
+    s2j._extract_text_cached.cache_clear()
+    try:
+        result = s2j.build_result(SAMPLE_PDF)
+    finally:
+        s2j._extract_text_cached.cache_clear()
+
+    subjects = result["subjects"]
+    assert len(subjects) == 64
+    assert (result["year"], result["semester"]) == ("2nd Year", "1st Semester")
+    by_code = {s["subject_code"]: s for s in subjects}
+    assert (by_code["IT/PC/B/T/211"]["year"], by_code["IT/PC/B/T/211"]["semester"]) == ("2nd Year", "1st Semester")
+    assert (by_code["IT/PC/B/T/221"]["year"], by_code["IT/PC/B/T/221"]["semester"]) == ("2nd Year", "2nd Semester")
+    assert (by_code["IT/PE/B/T/412A"]["year"], by_code["IT/PE/B/T/412A"]["semester"]) == ("4th Year", "1st Semester")
+    assert (by_code["IT/HS/B/T/422"]["year"], by_code["IT/HS/B/T/422"]["semester"]) == ("4th Year", "2nd Semester")
+    assert all("  " not in s["subject"] for s in subjects)
+
+
+def test_write_json_output_does_not_depend_on_orjson(monkeypatch, tmp_path):
+    orjson = pytest.importorskip("orjson")
+    result = {"year": "2nd Year", "semester": "", "subjects": [
+        {"subject": "Données", "subject_code": "IT/PC/B/T/211", "topics": ["a", "b"], "course_outcomes": []}]}
+    with_orjson, without = tmp_path / "a.json", tmp_path / "b.json"
+    s2j.write_json(result, with_orjson)
+    monkeypatch.setattr(s2j, "orjson", None)
+    s2j.write_json(result, without)
+    assert with_orjson.read_bytes() == without.read_bytes()
+    assert orjson.loads(without.read_bytes()) == result